@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the table renderer used by the node, workflow and model sections.
+
+Renders synthetic node inventories of 1k, 10k and 50k rows and reports render time,
+peak Python memory (tracemalloc, measured in a separate run since tracing slows the
+render down), page count and PDF size. --compare-write also times the previous
+line-by-line write() rendering for the smaller sizes.
+
+    python benchmark_pdf_tables.py [--sizes 1000 10000 50000] [--compare-write]
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import tracemalloc
+
+# Add the current directory to Python path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fpdf import FPDF
+from pdf_fonts import get_font_provider, FONT_FAMILY
+from pdf_tables import render_table, TableColumn
+
+COLUMNS = [TableColumn('Node', 4), TableColumn('Category', 3), TableColumn('Package', 3)]
+# write() takes minutes beyond this
+MAX_WRITE_ROWS = 10000
+
+
+def node_rows(count):
+    """Rows shaped like a large install: a few hundred packs, some long node names."""
+    for i in range(count):
+        name = f"Node{i:06d}" + ("AdvancedLatentUpscaleWithModel" if i % 7 == 0 else "")
+        yield name, f"category/{i % 40}", f"ComfyUI-Pack-{i % 300:03d}"
+
+
+def new_pdf():
+    pdf = FPDF()
+    get_font_provider().register(pdf, FONT_FAMILY)
+    pdf.add_page()
+    return pdf
+
+
+def render_with_table(count, path):
+    pdf = new_pdf()
+    render_table(pdf, FONT_FAMILY, COLUMNS, node_rows(count), bands=2)
+    pdf.output(path)
+    return pdf.page_no()
+
+
+def render_with_write(count, path):
+    pdf = new_pdf()
+    pdf.set_font(FONT_FAMILY, '', 10)
+    lines = [f"• {name} ({category}) - Package: {package}" for name, category, package in node_rows(count)]
+    for line in lines:
+        pdf.write(5, line + '\n')
+    pdf.output(path)
+    return pdf.page_no()
+
+
+def measure(render, count, path):
+    start = time.perf_counter()
+    pages = render(count, path)
+    elapsed = time.perf_counter() - start
+    size = os.path.getsize(path)
+
+    tracemalloc.start()
+    render(count, path)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak, pages, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 50000])
+    parser.add_argument('--compare-write', action='store_true', help="also time line-by-line write()")
+    args = parser.parse_args()
+
+    renderers = [("table", render_with_table)]
+    if args.compare_write:
+        renderers.append(("write", render_with_write))
+
+    print(f"{'renderer':<8} {'rows':>7} {'time (s)':>9} {'peak (MB)':>10} {'pages':>6} {'PDF (KB)':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'benchmark.pdf')
+        for count in args.sizes:
+            for name, render in renderers:
+                if name == "write" and count > MAX_WRITE_ROWS:
+                    continue
+                elapsed, peak, pages, size = measure(render, count, path)
+                print(f"{name:<8} {count:>7} {elapsed:>9.2f} {peak / 2**20:>10.1f} {pages:>6} {size / 1024:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+import os
+import re
+import json
+import hashlib
+import threading
+
+# Reference license texts shipped with the node, one <SPDX-ID>.txt per license
+REFERENCE_DIR = os.path.join(os.path.dirname(__file__), 'data', 'licenses')
+CACHE_FILE = os.path.join(os.path.dirname(__file__), 'license_classifications.json')
+CACHE_VERSION = 1
+
+SHINGLE_SIZE = 5
+# Share of a reference text's shingles that must appear in the candidate
+MATCH_THRESHOLD = 0.8
+
+TOKEN_REGEX = re.compile(r"[a-z0-9]+")
+# Copyright lines and year/holder placeholders differ between copies of the same license
+COPYRIGHT_LINE_REGEX = re.compile(r"^\s*(copyright\b|\(c\)|©).*$", re.IGNORECASE | re.MULTILINE)
+
+# Licenses whose text is a near copy of another reference, told apart by their title
+TITLE_VARIANTS = {
+    "GPL-3.0": [("gnu affero general public license", "AGPL-3.0")],
+}
+
+# Common free-form names found in pyproject.toml / setup.cfg license fields and classifiers
+LICENSE_ALIASES = {
+    "mit": "MIT",
+    "mit license": "MIT",
+    "apache 2.0": "Apache-2.0",
+    "apache-2.0": "Apache-2.0",
+    "apache license 2.0": "Apache-2.0",
+    "apache software license": "Apache-2.0",
+    "apache license, version 2.0": "Apache-2.0",
+    "bsd": "BSD-3-Clause",
+    "bsd license": "BSD-3-Clause",
+    "isc": "ISC",
+    "isc license (iscl)": "ISC",
+    "gplv2": "GPL-2.0",
+    "gpl-2.0": "GPL-2.0",
+    "gnu general public license v2 (gplv2)": "GPL-2.0",
+    "gplv3": "GPL-3.0",
+    "gpl-3.0": "GPL-3.0",
+    "gpl-3.0-only": "GPL-3.0",
+    "gpl-3.0-or-later": "GPL-3.0",
+    "gnu general public license v3 (gplv3)": "GPL-3.0",
+    "agpl-3.0": "AGPL-3.0",
+    "gnu affero general public license v3": "AGPL-3.0",
+    "lgpl-3.0": "LGPL-3.0",
+    "gnu lesser general public license v3 (lgplv3)": "LGPL-3.0",
+    "mpl-2.0": "MPL-2.0",
+    "mozilla public license 2.0 (mpl 2.0)": "MPL-2.0",
+    "the unlicense (unlicense)": "Unlicense",
+    "unlicense": "Unlicense",
+    "cc0 1.0 universal (cc0 1.0) public domain dedication": "CC0-1.0",
+}
+
+
+def normalize_license_name(name):
+    """Maps a free-form license name to its SPDX ID, or returns it unchanged."""
+    return LICENSE_ALIASES.get(name.strip().lower(), name.strip())
+
+
+def _tokens(text):
+    return TOKEN_REGEX.findall(COPYRIGHT_LINE_REGEX.sub(" ", text).lower())
+
+
+def _shingles(tokens):
+    return {hash(tuple(tokens[i:i + SHINGLE_SIZE])) for i in range(max(len(tokens) - SHINGLE_SIZE + 1, 1))}
+
+
+class LicenseClassifier:
+    """
+    Maps full license texts to SPDX IDs.
+
+    Each reference text is reduced to a set of token shingles, and an inverted index
+    (shingle -> licenses) lets a candidate be scored against all references in one
+    pass over its own shingles. Results are cached by a hash of the normalized text,
+    so every distinct license text is classified at most once per install.
+    """
+    def __init__(self, reference_dir=REFERENCE_DIR, cache_path=CACHE_FILE):
+        self.reference_dir = reference_dir
+        self.cache_path = cache_path
+        self._lock = threading.Lock()
+        self._index = None
+        self._reference_sizes = {}
+        self._corpus_signature = None
+        self._cache = None
+        self._cache_dirty = False
+
+    def _build_index(self):
+        index = {}
+        sizes = {}
+        signature = hashlib.sha1()
+        for filename in sorted(os.listdir(self.reference_dir)):
+            if not filename.endswith('.txt'):
+                continue
+            spdx_id = filename[:-len('.txt')]
+            with open(os.path.join(self.reference_dir, filename), 'r', encoding='utf-8') as f:
+                text = f.read()
+            signature.update(f"{spdx_id}\0{hashlib.sha1(text.encode('utf-8')).hexdigest()}\n".encode('utf-8'))
+            shingles = _shingles(_tokens(text))
+            sizes[spdx_id] = len(shingles)
+            for shingle in shingles:
+                index.setdefault(shingle, []).append(spdx_id)
+        self._index = index
+        self._reference_sizes = sizes
+        self._corpus_signature = signature.hexdigest()
+
+    def _ensure_loaded(self):
+        if self._index is not None:
+            return
+        with self._lock:
+            if self._index is not None:
+                return
+            self._build_index()
+            self._cache = self._read_cache()
+
+    def _read_cache(self):
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return {}
+        try:
+            with open(self.cache_path, 'r') as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        # Entries are only valid for the reference corpus they were computed against
+        if cache.get('version') != CACHE_VERSION or cache.get('corpus') != self._corpus_signature:
+            return {}
+        return cache.get('entries', {})
+
+    def text_hash(self, text):
+        return hashlib.sha1(" ".join(_tokens(text)).encode('utf-8')).hexdigest()
+
+    def classify(self, text):
+        """Returns the SPDX ID of a license text, or None when no reference matches confidently."""
+        self._ensure_loaded()
+        key = self.text_hash(text)
+        if key in self._cache:
+            return self._cache[key]
+
+        spdx_id = self._classify_uncached(text)
+        self.remember(key, spdx_id)
+        return spdx_id
+
+    def remember(self, key, spdx_id):
+        """Records a classification, e.g. one computed in a scan worker process."""
+        self._ensure_loaded()
+        if self._cache.get(key, object()) != spdx_id:
+            self._cache[key] = spdx_id
+            self._cache_dirty = True
+
+    def _classify_uncached(self, text):
+        hits = {}
+        for shingle in _shingles(_tokens(text)):
+            for spdx_id in self._index.get(shingle, ()):
+                hits[spdx_id] = hits.get(spdx_id, 0) + 1
+
+        best_id, best_hits = None, 0
+        for spdx_id, count in hits.items():
+            # A longer license that contains a shorter one (BSD-3 vs BSD-2) wins on hit count
+            if count / self._reference_sizes[spdx_id] >= MATCH_THRESHOLD and count > best_hits:
+                best_id, best_hits = spdx_id, count
+        if best_id is None:
+            return None
+
+        head = " ".join(_tokens(text[:1000]))
+        for title, variant in TITLE_VARIANTS.get(best_id, []):
+            if title in head:
+                return variant
+        return best_id
+
+    def save(self):
+        """Writes new classifications to the on-disk cache."""
+        if not self._cache_dirty or not self.cache_path:
+            return
+        with self._lock:
+            cache = {"version": CACHE_VERSION, "corpus": self._corpus_signature, "entries": self._cache}
+            try:
+                with open(self.cache_path, 'w') as f:
+                    json.dump(cache, f)
+                self._cache_dirty = False
+            except OSError as e:
+                print(f"LicenseClassifier: Could not write {self.cache_path}: {e}")
+
+
+_classifier = None
+
+def get_license_classifier():
+    """Returns the classifier shared by this process."""
+    global _classifier
+    if _classifier is None:
+        _classifier = LicenseClassifier()
+    return _classifier
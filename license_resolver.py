@@ -0,0 +1,335 @@
+import os
+import re
+import time
+import threading
+from urllib.parse import urlsplit, quote
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
+from .model_license_cache import UNKNOWN_LICENSE
+
+# Base URLs can point at a local stand-in server (see license_standin_server.py)
+# for offline installs, tests and benchmarks. HF_ENDPOINT is the variable the
+# huggingface_hub client uses for mirrors as well.
+HF_BASE_URL = os.environ.get("HF_ENDPOINT", "https://huggingface.co").rstrip('/')
+CIVITAI_BASE_URL = os.environ.get("WORKFLOW_SUMMARY_CIVITAI_URL", "https://civitai.com").rstrip('/')
+# "sequential" asks providers in order; "race" asks all of them at once
+RESOLVER_MODE = os.environ.get("WORKFLOW_SUMMARY_LICENSE_MODE", "sequential")
+
+PROVIDER_TIMEOUT = 5  # seconds per HTTP request, further capped by the remaining budget
+HTTP_POOL_SIZE = 8
+
+LICENSE_PENDING = "pending (lookup timed out)"
+# Appended to the source of answers found by content hash ("civitai:sha256"); only
+# those identify the file itself and may be cached under its hash
+HASH_SOURCE_SUFFIX = ":sha256"
+
+
+def debug(msg):
+    print(f"[WorkflowSummary][LicenseLookup] {msg}")
+
+
+_http_sessions = {}
+_http_sessions_lock = threading.Lock()
+
+def http_get(url, timeout):
+    """GET through one pooled requests.Session per host, so connections are reused."""
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    host = urlsplit(url).netloc
+    with _http_sessions_lock:
+        session = _http_sessions.get(host)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=HTTP_POOL_SIZE)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _http_sessions[host] = session
+    return session.get(url, timeout=timeout)
+
+
+class BudgetExhausted(Exception):
+    """Raised when a lookup would start after the export's latency budget ran out."""
+
+
+def remaining_time(deadline, cap):
+    """Timeout for the next request: cap, or less when the deadline is closer."""
+    if deadline is None:
+        return cap
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise BudgetExhausted()
+    return min(cap, remaining)
+
+
+class LicenseProvider:
+    """
+    A source of model licenses. lookup() returns (license, source) for a confident
+    answer and None otherwise, and must not run past deadline (a time.monotonic()
+    value, or None for no limit). Providers that can identify a model file by its
+    SHA256 also implement lookup_hash(), which the chain tries before any lookup
+    by name.
+    """
+    name = "provider"
+    timeout = PROVIDER_TIMEOUT
+
+    def lookup(self, model_name, deadline=None):
+        raise NotImplementedError
+
+    def lookup_hash(self, sha256, deadline=None):
+        return None
+
+    def _get(self, url, deadline):
+        """HTTP GET capped by the remaining budget; a request cut off by it raises BudgetExhausted."""
+        try:
+            return http_get(url, timeout=remaining_time(deadline, self.timeout))
+        except BudgetExhausted:
+            raise
+        except Exception:
+            if deadline is not None and time.monotonic() >= deadline:
+                raise BudgetExhausted()
+            raise
+
+
+class HuggingFaceProvider(LicenseProvider):
+    name = "huggingface"
+
+    def __init__(self, base_url=None, timeout=PROVIDER_TIMEOUT):
+        self.base_url = (base_url or HF_BASE_URL).rstrip('/')
+        self.timeout = timeout
+
+    def _repo_license(self, repo_id, deadline):
+        """Reads the license of one repo from its top-level field, card data or tags."""
+        url = f"{self.base_url}/api/models/{repo_id}"
+        debug(f"Trying HuggingFace direct lookup: {url}")
+        try:
+            resp = self._get(url, deadline)
+        except BudgetExhausted:
+            raise
+        except Exception as e:
+            debug(f"Direct lookup exception: {e}")
+            return None
+        debug(f"Direct lookup status: {resp.status_code}")
+        if resp.status_code != 200:
+            return None
+
+        try:
+            meta = resp.json()
+        except ValueError as e:
+            # Proxies and error pages answer 200 with HTML
+            debug(f"Direct lookup returned no JSON: {e}")
+            return None
+        if not isinstance(meta, dict):
+            return None
+        if isinstance(meta.get("license"), str) and meta["license"]:
+            return meta["license"]
+        for k in ["cardData", "modelCardData"]:
+            if isinstance(meta.get(k), dict):
+                for subk in ["license", "license_name"]:
+                    if meta[k].get(subk):
+                        return meta[k][subk]
+        for tag in meta.get("tags", []):
+            if isinstance(tag, str) and tag.startswith("license:"):
+                return tag[len("license:"):]
+        return None
+
+    def lookup(self, model_name, deadline=None):
+        base_name = os.path.splitext(os.path.basename(model_name))[0]
+
+        # Direct lookup by filename (legacy, may fail)
+        license_val = self._repo_license(base_name, deadline)
+        if license_val:
+            debug(f"Direct HuggingFace license found: {license_val}")
+            return f"HuggingFace: {license_val}", self.name
+
+        # Search API if the direct lookup fails
+        alphanum = re.sub(r'[^a-zA-Z0-9]', '', base_name)
+        search_key = alphanum[:6] if len(alphanum) >= 6 else alphanum
+        url = f"{self.base_url}/api/models?search={quote(search_key)}"
+        debug(f"Trying HuggingFace search: {url}")
+        try:
+            resp = self._get(url, deadline)
+        except BudgetExhausted:
+            raise
+        except Exception as e:
+            debug(f"Search exception: {e}")
+            return None
+        debug(f"Search status: {resp.status_code}")
+        if resp.status_code != 200:
+            return None
+
+        try:
+            data = resp.json()
+        except ValueError as e:
+            debug(f"Search returned no JSON: {e}")
+            return None
+        if not isinstance(data, list) or not data:
+            return None
+
+        def score(repo):
+            rid = repo.get("modelId", "").lower()
+            if base_name.lower() in rid:
+                return 2
+            if rid.startswith(search_key.lower()):
+                return 1
+            return 0
+        repo_id = max(data, key=score).get("modelId")
+        debug(f"Best match repo_id: {repo_id}")
+        if repo_id:
+            license_val = self._repo_license(repo_id, deadline)
+            if license_val:
+                debug(f"Search HuggingFace license found: {license_val}")
+                return f"HuggingFace: {license_val} (from search: {repo_id})", self.name
+        return None
+
+
+class CivitAIProvider(LicenseProvider):
+    name = "civitai"
+
+    def __init__(self, base_url=None, timeout=PROVIDER_TIMEOUT):
+        self.base_url = (base_url or CIVITAI_BASE_URL).rstrip('/')
+        self.timeout = timeout
+
+    def _fetch_json(self, url, deadline):
+        debug(f"Trying CivitAI lookup: {url}")
+        try:
+            resp = self._get(url, deadline)
+        except BudgetExhausted:
+            raise
+        except Exception as e:
+            debug(f"CivitAI exception: {e}")
+            return None
+        debug(f"CivitAI status: {resp.status_code}")
+        if resp.status_code != 200:
+            return None
+        try:
+            data = resp.json()
+        except ValueError as e:
+            debug(f"CivitAI returned no JSON: {e}")
+            return None
+        return data if isinstance(data, dict) else None
+
+    @staticmethod
+    def _item_license(item):
+        if item.get("modelVersions"):
+            mv = item["modelVersions"][0]
+            if mv.get("license"):
+                return mv["license"]
+        return item.get("license")
+
+    def lookup_hash(self, sha256, deadline=None):
+        version = self._fetch_json(f"{self.base_url}/api/v1/model-versions/by-hash/{sha256}", deadline)
+        if not version or not version.get("modelId"):
+            return None
+        item = self._fetch_json(f"{self.base_url}/api/v1/models/{version['modelId']}", deadline)
+        license_val = self._item_license(item) if item else None
+        if license_val:
+            debug(f"CivitAI license found by hash: {license_val}")
+            return f"CivitAI: {license_val}", self.name
+        return None
+
+    def lookup(self, model_name, deadline=None):
+        civitai_name = os.path.splitext(os.path.basename(model_name))[0]
+        data = self._fetch_json(f"{self.base_url}/api/v1/models?query={quote(civitai_name)}", deadline)
+        if data and data.get("items"):
+            license_val = self._item_license(data["items"][0])
+            if license_val:
+                debug(f"CivitAI license found: {license_val}")
+                return f"CivitAI: {license_val}", self.name
+        return None
+
+
+class LicenseResolverChain:
+    """
+    Runs license providers under a latency budget and stops at the first confident
+    answer. In "sequential" mode providers are asked in order; in "race" mode they
+    are asked side by side and the first answer wins. When the model's SHA256 is
+    known, hash lookups run before the lookups by name.
+
+    resolve() returns (license, source). When every provider answered without a
+    license the result is (UNKNOWN_LICENSE, "none"); when the budget ran out first it
+    is (LICENSE_PENDING, "timeout"), which callers should not cache. Answers from
+    hash lookups have HASH_SOURCE_SUFFIX appended to their source.
+    """
+    def __init__(self, providers, mode=RESOLVER_MODE):
+        if mode not in ("sequential", "race"):
+            raise ValueError(f"Unknown license resolver mode: {mode}")
+        self.providers = list(providers)
+        self.mode = mode
+
+    def resolve(self, model_name, deadline=None, sha256=None):
+        calls = []
+        if sha256:
+            calls += [(provider.name, self._by_hash(provider), sha256) for provider in self.providers]
+        calls += [(provider.name, provider.lookup, model_name) for provider in self.providers]
+        if self.mode == "race" and len(self.providers) > 1:
+            return self._resolve_race(model_name, calls, deadline)
+        return self._resolve_sequential(model_name, calls, deadline)
+
+    @staticmethod
+    def _by_hash(provider):
+        def lookup(sha256, deadline):
+            result = provider.lookup_hash(sha256, deadline)
+            return (result[0], result[1] + HASH_SOURCE_SUFFIX) if result else None
+        return lookup
+
+    def _resolve_sequential(self, model_name, calls, deadline):
+        for provider_name, lookup, key in calls:
+            try:
+                result = lookup(key, deadline)
+            except BudgetExhausted:
+                debug(f"Latency budget exhausted before {provider_name} answered for {model_name}")
+                return LICENSE_PENDING, "timeout"
+            except Exception as e:
+                # One failing provider must not keep the others from being asked
+                debug(f"Provider {provider_name} exception: {e}")
+                continue
+            if result:
+                return result
+        debug("No license found, returning 'unknown'")
+        return UNKNOWN_LICENSE, "none"
+
+    def _resolve_race(self, model_name, calls, deadline):
+        executor = ThreadPoolExecutor(max_workers=len(calls))
+        futures = [executor.submit(lookup, key, deadline) for _, lookup, key in calls]
+        timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+        timed_out = False
+        try:
+            for future in as_completed(futures, timeout=timeout):
+                try:
+                    result = future.result()
+                except BudgetExhausted:
+                    timed_out = True
+                    continue
+                except Exception as e:
+                    debug(f"Provider exception: {e}")
+                    continue
+                if result:
+                    return result
+        except FuturesTimeoutError:
+            timed_out = True
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        if timed_out:
+            debug(f"Latency budget exhausted while racing providers for {model_name}")
+            return LICENSE_PENDING, "timeout"
+        debug("No license found, returning 'unknown'")
+        return UNKNOWN_LICENSE, "none"
+
+
+_resolver = None
+_resolver_lock = threading.Lock()
+
+def get_license_resolver():
+    """Returns the resolver chain shared by this process (HuggingFace, then CivitAI)."""
+    global _resolver
+    with _resolver_lock:
+        if _resolver is None:
+            _resolver = LicenseResolverChain([HuggingFaceProvider(), CivitAIProvider()])
+        return _resolver
+
+def set_license_resolver(resolver):
+    """Replaces the shared resolver, e.g. with custom providers or stand-in URLs."""
+    global _resolver
+    with _resolver_lock:
+        _resolver = resolver
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the HuggingFace and CivitAI model APIs used by the license
+resolver. Point HF_ENDPOINT and WORKFLOW_SUMMARY_CIVITAI_URL at it (or pass its
+base_url to the providers) to run license lookups offline, in tests or benchmarks.
+
+Fixtures are a JSON object:
+    {"huggingface": {"<repo_id>": "<license>"}, "civitai": {"<model name>": "<license>"},
+     "civitai_hashes": {"<sha256>": "<civitai model name>"}, "non_json": ["huggingface"]}
+
+APIs listed in "non_json" answer every request with a 200 HTML page, as captive
+portals and misconfigured proxies do.
+
+Usage:
+    python license_standin_server.py fixtures.json --port 8765 --latency 0.2
+"""
+
+import sys
+import json
+import time
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs, unquote
+
+
+def _make_handler(fixtures, latency):
+    huggingface = fixtures.get("huggingface", {})
+    civitai = fixtures.get("civitai", {})
+    civitai_ids = {str(i): model for i, model in enumerate(civitai, start=1)}
+    civitai_hashes = {h.lower(): model for h, model in fixtures.get("civitai_hashes", {}).items()}
+    non_json = set(fixtures.get("non_json", []))
+
+    class StandinHandler(BaseHTTPRequestHandler):
+        def _send_json(self, status, payload):
+            body = json.dumps(payload).encode('utf-8')
+            try:
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            except (BrokenPipeError, ConnectionResetError):
+                # The resolver gave up on this request (budget or race already won)
+                pass
+
+        def _send_html(self):
+            body = b"<html><body>Sign in to continue</body></html>"
+            try:
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+        def do_GET(self):
+            if latency:
+                time.sleep(latency)
+            url = urlsplit(self.path)
+            query = parse_qs(url.query)
+            api = "civitai" if url.path.startswith("/api/v1/") else "huggingface"
+
+            if api in non_json:
+                self._send_html()
+            elif url.path == "/api/models":
+                key = query.get("search", [""])[0].lower()
+                self._send_json(200, [{"modelId": repo_id} for repo_id in huggingface if key in repo_id.lower()])
+            elif url.path.startswith("/api/models/"):
+                repo_id = unquote(url.path[len("/api/models/"):])
+                if repo_id in huggingface:
+                    self._send_json(200, {"modelId": repo_id, "cardData": {"license": huggingface[repo_id]}})
+                else:
+                    self._send_json(404, {"error": "Repository not found"})
+            elif url.path == "/api/v1/models":
+                name = query.get("query", [""])[0].lower()
+                items = [{"id": int(model_id), "name": model, "modelVersions": [{"license": civitai[model]}]}
+                         for model_id, model in civitai_ids.items() if name in model.lower()]
+                self._send_json(200, {"items": items})
+            elif url.path.startswith("/api/v1/models/"):
+                model = civitai_ids.get(url.path[len("/api/v1/models/"):])
+                if model is not None:
+                    self._send_json(200, {"id": int(url.path.rsplit('/', 1)[1]), "name": model,
+                                          "modelVersions": [{"license": civitai[model]}]})
+                else:
+                    self._send_json(404, {"error": "Model not found"})
+            elif url.path.startswith("/api/v1/model-versions/by-hash/"):
+                model = civitai_hashes.get(url.path.rsplit('/', 1)[1].lower())
+                model_id = next((i for i, m in civitai_ids.items() if m == model), None)
+                if model_id is not None:
+                    self._send_json(200, {"modelId": int(model_id), "model": {"name": model}})
+                else:
+                    self._send_json(404, {"error": "Model not found"})
+            else:
+                self._send_json(404, {"error": "Not found"})
+
+        def log_message(self, format, *args):
+            pass
+
+    return StandinHandler
+
+
+def start_standin_server(fixtures, latency=0.0, host="127.0.0.1", port=0):
+    """Starts the server in a daemon thread. Returns it; server.base_url is its root URL."""
+    server = ThreadingHTTPServer((host, port), _make_handler(fixtures, latency))
+    server.daemon_threads = True
+    server.base_url = f"http://{host}:{server.server_address[1]}"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("fixtures", help="JSON file with huggingface/civitai license fixtures")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds to wait before each response")
+    args = parser.parse_args()
+
+    with open(args.fixtures, 'r') as f:
+        fixtures = json.load(f)
+    server = start_standin_server(fixtures, args.latency, args.host, args.port)
+    print(f"License stand-in server listening on {server.base_url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,161 @@
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+
+CACHE_FILE = os.path.join(os.path.dirname(__file__), 'model_file_cache.sqlite3')
+
+# Files are read through one reused buffer, so memory per hash stays at HASH_CHUNK_SIZE
+HASH_CHUNK_SIZE = 1024 * 1024
+# The partial hash covers the size plus this many bytes at the start, middle and end
+PARTIAL_SAMPLE_SIZE = 1024 * 1024
+# Full hashes are disk bound; more workers than this only make the reads compete
+HASH_WORKERS = 2
+
+
+def _read_into_hash(f, digest, buffer, length=None):
+    view = memoryview(buffer)
+    remaining = length
+    while remaining is None or remaining > 0:
+        wanted = len(buffer) if remaining is None else min(len(buffer), remaining)
+        read = f.readinto(view[:wanted])
+        if not read:
+            break
+        digest.update(view[:read])
+        if remaining is not None:
+            remaining -= read
+
+
+def sha256_file(path, chunk_size=HASH_CHUNK_SIZE):
+    """Full SHA256 of a file, streamed through a fixed-size buffer."""
+    digest = hashlib.sha256()
+    with open(path, 'rb', buffering=0) as f:
+        _read_into_hash(f, digest, bytearray(chunk_size))
+    return digest.hexdigest()
+
+
+def partial_hash_file(path, sample_size=PARTIAL_SAMPLE_SIZE):
+    """
+    Fast content fingerprint: SHA256 of the file size and three samples (start,
+    middle, end). Reads at most 3 * sample_size bytes regardless of file size.
+    """
+    size = os.path.getsize(path)
+    digest = hashlib.sha256(size.to_bytes(8, 'little'))
+    buffer = bytearray(min(sample_size, HASH_CHUNK_SIZE))
+    with open(path, 'rb', buffering=0) as f:
+        if size <= 3 * sample_size:
+            _read_into_hash(f, digest, buffer)
+        else:
+            for offset in (0, (size - sample_size) // 2, size - sample_size):
+                f.seek(offset)
+                _read_into_hash(f, digest, buffer, sample_size)
+    return digest.hexdigest()
+
+
+class ModelHasher:
+    """
+    Content hashes of model files, cached on disk by (path, size, mtime) so a
+    multi-GB checkpoint is read in full only once.
+
+    identify() returns the partial hash right away and waits a bounded time for
+    the full SHA256, which is computed on a small background pool. A hash that is
+    not ready in time keeps running and is cached for the next export.
+    """
+    def __init__(self, path=CACHE_FILE, workers=HASH_WORKERS):
+        self.path = path
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="model-hash")
+        self._pending = {}
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS model_hashes ("
+            " path TEXT PRIMARY KEY,"
+            " size INTEGER NOT NULL,"
+            " mtime_ns INTEGER NOT NULL,"
+            " partial TEXT NOT NULL,"
+            " sha256 TEXT,"
+            " hashed_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def _cached(self, path, size, mtime_ns):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT partial, sha256 FROM model_hashes WHERE path = ? AND size = ? AND mtime_ns = ?",
+                (path, size, mtime_ns)
+            ).fetchone()
+        return row
+
+    def _store(self, path, size, mtime_ns, partial, sha256):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO model_hashes (path, size, mtime_ns, partial, sha256, hashed_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (path, size, mtime_ns, partial, sha256, time.time())
+            )
+            self._conn.commit()
+
+    def _hash_full(self, path, size, mtime_ns, partial):
+        try:
+            sha256 = sha256_file(path)
+            self._store(path, size, mtime_ns, partial, sha256)
+            return sha256
+        finally:
+            with self._lock:
+                self._pending.pop((path, size, mtime_ns), None)
+
+    def submit(self, path, size, mtime_ns, partial):
+        """Queues the full hash of a file (once per file version). Returns its future."""
+        key = (path, size, mtime_ns)
+        with self._lock:
+            future = self._pending.get(key)
+            if future is None:
+                future = self._executor.submit(self._hash_full, path, size, mtime_ns, partial)
+                self._pending[key] = future
+        return future
+
+    def identify(self, path, timeout=None):
+        """
+        Returns (partial, sha256) for a model file; sha256 is None when the full hash
+        did not finish within timeout seconds. Returns None if the file is unreadable.
+        """
+        path = os.path.abspath(path)
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+
+        row = self._cached(path, st.st_size, st.st_mtime_ns)
+        if row and row[1]:
+            return row[0], row[1]
+
+        try:
+            partial = row[0] if row else partial_hash_file(path)
+        except OSError as e:
+            print(f"[WorkflowSummary][ModelHash] Could not read {path}: {e}")
+            return None
+        if not row:
+            self._store(path, st.st_size, st.st_mtime_ns, partial, None)
+
+        future = self.submit(path, st.st_size, st.st_mtime_ns, partial)
+        try:
+            return partial, future.result(timeout=timeout)
+        except FuturesTimeoutError:
+            return partial, None
+        except OSError as e:
+            print(f"[WorkflowSummary][ModelHash] Could not hash {path}: {e}")
+            return partial, None
+
+
+_hasher = None
+_hasher_lock = threading.Lock()
+
+def get_model_hasher():
+    """Returns the hasher shared by this process."""
+    global _hasher
+    with _hasher_lock:
+        if _hasher is None:
+            _hasher = ModelHasher()
+        return _hasher
@@ -0,0 +1,165 @@
+import os
+import re
+import json
+import threading
+from .model_path_index import MODEL_FOLDERS
+
+# Optional per-install rules, same layout as the tables below:
+# {"exact": {"<input>": "<type>"}, "suffix": {"<suffix>": "<type>"},
+#  "overrides": {"<NodeClass>": {"<input>": "<type>" or null}}, "model_folders": ["<folder>"]}
+RULES_FILE = os.path.join(os.path.dirname(__file__), 'model_input_rules.json')
+
+# Input names that always hold a model file name
+EXACT_RULES = {
+    "ckpt_name": "checkpoint",
+    "checkpoint": "checkpoint",
+    "model_name": "checkpoint",
+    "lora_name": "lora",
+    "lora": "lora",
+    "lycoris_name": "lycoris",
+    "control_net_name": "controlnet",
+    "controlnet_name": "controlnet",
+    "controlnet": "controlnet",
+    "control_net": "controlnet",
+    "vae_name": "vae",
+    "vae": "vae",
+    "upscale_model": "upscaler",
+    "upscale_model_name": "upscaler",
+    "embedding": "embedding",
+    "textual_inversion": "embedding",
+    "face_restore_model": "face_restoration",
+    "face_restore_model_name": "face_restoration",
+    "gfpgan_model": "face_restoration",
+    "clip_name": "clip",
+    "unet_name": "unet",
+    "style_model_name": "style_model",
+    "gligen_name": "gligen",
+    "hypernetwork_name": "hypernetwork",
+}
+
+# Input name endings, for prefixed variants such as "refiner_ckpt_name"
+SUFFIX_RULES = {
+    "_ckpt_name": "checkpoint",
+    "_lora_name": "lora",
+    "_vae_name": "vae",
+    "_control_net_name": "controlnet",
+    "_controlnet_name": "controlnet",
+    "_clip_name": "clip",
+    "_unet_name": "unet",
+    "_upscale_model": "upscaler",
+    "_upscale_model_name": "upscaler",
+}
+
+# Per node class; None marks an input that is not a model even though its name matches
+NODE_OVERRIDES = {
+    "UpscaleModelLoader": {"model_name": "upscaler"},
+    "FaceRestoreModelLoader": {"model_name": "face_restoration", "model": "face_restoration"},
+    "CLIPVisionLoader": {"clip_name": "clip_vision"},
+}
+
+# folder_paths folders that hold models, besides the ones searched per model type
+# (MODEL_FOLDERS). Inputs listing other folders, such as CheckpointLoader's config_name
+# from "configs", are not models even when the node scan recorded them.
+EXTRA_MODEL_FOLDERS = [
+    "photomaker", "vae_approx", "diffusers", "model_patches", "audio_encoders", "latent_upscale_models",
+    "ipadapter", "instantid", "insightface", "pulid", "sams", "ultralytics", "ultralytics_bbox",
+    "ultralytics_segm", "animatediff_models", "animatediff_motion_lora", "LLM",
+]
+
+# "clip_name1", "lora_name_2": numbered copies of the same input
+NUMBERED_INPUT_REGEX = re.compile(r"_?\d+$")
+
+
+class ModelInputClassifier:
+    """
+    Decides which node inputs name model files, and of what type.
+
+    The rules are plain dicts (exact input names, input name suffixes, per node class
+    overrides) and every (node_type, input_key) answer is memoized, so classifying an
+    input costs one dict lookup after the first time. One classifier can be shared
+    across any number of workflows.
+    """
+    def __init__(self, exact=None, suffix=None, overrides=None, model_folders=None, rules_file=RULES_FILE):
+        self.exact = dict(EXACT_RULES if exact is None else exact)
+        self.suffix = dict(SUFFIX_RULES if suffix is None else suffix)
+        self.overrides = {node: dict(rules) for node, rules in (NODE_OVERRIDES if overrides is None else overrides).items()}
+        self.model_folders = set(MODEL_FOLDERS + EXTRA_MODEL_FOLDERS if model_folders is None else model_folders)
+        self._lock = threading.Lock()
+        self._memo = {}
+        self._compile()
+        if rules_file and os.path.exists(rules_file):
+            self.load_rules(rules_file)
+
+    def load_rules(self, path):
+        """Merges rules from a JSON file into the tables."""
+        try:
+            with open(path, 'r') as f:
+                rules = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"[WorkflowSummary] Could not load model input rules from {path}: {e}")
+            return
+        self.add_rules(rules.get("exact"), rules.get("suffix"), rules.get("overrides"), rules.get("model_folders"))
+
+    def add_rules(self, exact=None, suffix=None, overrides=None, model_folders=None):
+        with self._lock:
+            self.exact.update(exact or {})
+            self.suffix.update(suffix or {})
+            self.model_folders.update(model_folders or [])
+            for node_type, rules in (overrides or {}).items():
+                self.overrides.setdefault(node_type, {}).update(rules)
+            self._compile()
+
+    def _compile(self):
+        # Longest suffix first, so "_control_net_name" is not taken for a shorter rule
+        self._suffix_order = sorted(self.suffix.items(), key=lambda rule: len(rule[0]), reverse=True)
+        self._memo = {}
+
+    def _classify_uncached(self, node_type, input_key):
+        node_rules = self.overrides.get(node_type)
+        if node_rules and input_key in node_rules:
+            return node_rules[input_key]
+
+        key = input_key.lower()
+        for candidate in (key, NUMBERED_INPUT_REGEX.sub("", key)):
+            if candidate in self.exact:
+                return self.exact[candidate]
+            for suffix, model_type in self._suffix_order:
+                if candidate.endswith(suffix):
+                    return model_type
+        return None
+
+    def classify(self, node_type, input_key):
+        """Returns the model type an input holds, or None when it is not a model input."""
+        key = (node_type, input_key)
+        try:
+            return self._memo[key]
+        except KeyError:
+            model_type = self._memo[key] = self._classify_uncached(node_type, input_key)
+            return model_type
+
+    def is_model_folder(self, folder):
+        """Whether a folder_paths folder named in a node's input schema holds models."""
+        return folder in self.model_folders
+
+    def detect(self, node_type, inputs):
+        """[{"name", "type", "input_key"}] for the model file names among a node's inputs."""
+        detected = []
+        for input_key, input_value in inputs.items():
+            # Optional model inputs offer "None" next to the folder's files
+            if isinstance(input_value, str) and input_value.strip() and input_value != "None":
+                model_type = self.classify(node_type, input_key)
+                if model_type:
+                    detected.append({"name": input_value, "type": model_type, "input_key": input_key})
+        return detected
+
+
+_classifier = None
+_classifier_lock = threading.Lock()
+
+def get_model_input_classifier():
+    """Returns the classifier shared by this process, with rules from model_input_rules.json."""
+    global _classifier
+    with _classifier_lock:
+        if _classifier is None:
+            _classifier = ModelInputClassifier()
+        return _classifier
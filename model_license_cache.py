@@ -0,0 +1,142 @@
+import os
+import time
+import sqlite3
+import threading
+
+CACHE_FILE = os.path.join(os.path.dirname(__file__), 'model_license_cache.sqlite3')
+
+# Resolved licenses rarely change; "unknown" results are retried sooner in case
+# the model was published or the network was down.
+POSITIVE_TTL = 30 * 24 * 3600
+NEGATIVE_TTL = 24 * 3600
+
+UNKNOWN_LICENSE = "unknown"
+
+
+def normalize_model_key(model_name):
+    """Cache key for a model: lowercased file name without folders or extension."""
+    base_name = os.path.basename(model_name.replace('\\', '/'))
+    return os.path.splitext(base_name)[0].lower()
+
+
+class ModelLicenseCache:
+    """
+    On-disk cache of resolved model licenses, keyed by normalized model name.
+    Each row stores the license, where it came from and when it was resolved;
+    positive and negative ("unknown") results expire after separate TTLs.
+
+    Licenses found by content hash are also kept under the file's hashes (full
+    SHA256 and partial hash), so a renamed or copied file resolves without a network
+    call. They expire after the positive TTL like name entries.
+    """
+    def __init__(self, path=CACHE_FILE, positive_ttl=POSITIVE_TTL, negative_ttl=NEGATIVE_TTL):
+        self.path = path
+        self.positive_ttl = positive_ttl
+        self.negative_ttl = negative_ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS model_licenses ("
+            " key TEXT PRIMARY KEY,"
+            " model_name TEXT NOT NULL,"
+            " license TEXT NOT NULL,"
+            " source TEXT NOT NULL,"
+            " resolved_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS hash_licenses ("
+            " hash TEXT PRIMARY KEY,"
+            " model_name TEXT NOT NULL,"
+            " license TEXT NOT NULL,"
+            " source TEXT NOT NULL,"
+            " resolved_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, model_name):
+        """Returns (license, source) for a fresh entry, or None on a miss or expired entry."""
+        key = normalize_model_key(model_name)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT license, source, resolved_at FROM model_licenses WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        license_val, source, resolved_at = row
+        ttl = self.negative_ttl if license_val == UNKNOWN_LICENSE else self.positive_ttl
+        if time.time() - resolved_at > ttl:
+            return None
+        return license_val, source
+
+    def put(self, model_name, license_val, source):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO model_licenses (key, model_name, license, source, resolved_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (normalize_model_key(model_name), model_name, license_val, source, time.time())
+            )
+            self._conn.commit()
+
+    def get_by_hash(self, *hashes):
+        """Returns (license, source) for the first content hash with a fresh entry, or None."""
+        oldest = time.time() - self.positive_ttl
+        with self._lock:
+            for content_hash in hashes:
+                if not content_hash:
+                    continue
+                row = self._conn.execute(
+                    "SELECT license, source FROM hash_licenses WHERE hash = ? AND resolved_at >= ?",
+                    (content_hash, oldest)
+                ).fetchone()
+                if row:
+                    return row
+        return None
+
+    def put_hash(self, hashes, model_name, license_val, source):
+        """Records the license of a model file under each of its content hashes."""
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO hash_licenses (hash, model_name, license, source, resolved_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                [(h, model_name, license_val, source, time.time()) for h in hashes if h]
+            )
+            self._conn.commit()
+
+    def invalidate(self, pattern=None, source=None, negative_only=False):
+        """
+        Bulk invalidation. pattern is a SQL LIKE pattern on the normalized key
+        (e.g. "sdxl%"); source limits it to one provider; negative_only drops only
+        cached "unknown" results. With no arguments the whole cache is cleared,
+        including the licenses recorded by content hash. Returns the number of
+        removed name entries.
+        """
+        clauses, params = [], []
+        if pattern:
+            clauses.append("key LIKE ?")
+            params.append(pattern.lower())
+        if source:
+            # Includes the provider's answers by hash ("civitai:sha256")
+            clauses.append("(source = ? OR source LIKE ?)")
+            params += [source, f"{source}:%"]
+        if negative_only:
+            clauses.append("license = ?")
+            params.append(UNKNOWN_LICENSE)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            removed = self._conn.execute(f"DELETE FROM model_licenses{where}", params).rowcount
+            if not clauses:
+                self._conn.execute("DELETE FROM hash_licenses")
+            self._conn.commit()
+        return removed
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_model_license_cache():
+    """Returns the cache shared by this process."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ModelLicenseCache()
+        return _cache
@@ -0,0 +1,152 @@
+import os
+import re
+import json
+import fnmatch
+import threading
+
+MAPPING_FILE = os.path.join(os.path.dirname(__file__), "model_licenses.json")
+
+HASH_KEY_PREFIX = "sha256:"
+# CivitAI's "AutoV2" short hash: the first 10 hex digits of the SHA256
+SHORT_HASH_LENGTH = 10
+GLOB_CHARS = re.compile(r"[*?\[]")
+# Trailing version / precision tags: "_1.0", "-v2", ".fp16", "_fp8_e4m3fn", "_pruned", "-emaonly", ...
+# Bare numbers ("v1-5") are kept, they usually tell models apart rather than versions.
+VERSION_SUFFIX_REGEX = re.compile(
+    r"[-_. ](v\d+(\.\d+)*|\d+(\.\d+)+|fp8(_e4m3fn|_e5m2)?|fp16|fp32|bf16|pruned|emaonly|ema)$"
+)
+SEPARATOR_REGEX = re.compile(r"[-_. ]+")
+
+
+def _stem(model_name):
+    base_name = os.path.basename(model_name.replace('\\', '/'))
+    return os.path.splitext(base_name)[0]
+
+
+def normalize_model_name(model_name):
+    """
+    Lowercased stem with trailing version/precision tags and separators removed, so
+    "sd_xl_base_1.0.safetensors" and "SDXL-Base-v1.safetensors" share "sdxlbase".
+    """
+    name = _stem(model_name).lower()
+    while True:
+        stripped = VERSION_SUFFIX_REGEX.sub("", name)
+        if stripped == name or not stripped:
+            break
+        name = stripped
+    return SEPARATOR_REGEX.sub("", name)
+
+
+class ModelLicenseIndex:
+    """
+    In-memory index over model_licenses.json, reloaded when the file changes.
+
+    Keys are matched, in order, by full name, basename, stem, normalized name, prefix
+    rules ("juggernaut*", longest prefix first) and glob rules ("*/flux1-*.safetensors",
+    in file order), so one entry can cover a whole family of checkpoints.
+    Keys of the form "sha256:<hex>" (full or 10-digit short hash) match model files
+    by content instead, see lookup_hash().
+    """
+    def __init__(self, path=MAPPING_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._stamp = None
+        self._exact = {}
+        self._stems = {}
+        self._normalized = {}
+        self._prefixes = {}
+        self._max_prefix = 0
+        self._globs = []
+        self._hashes = {}
+
+    def _file_stamp(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def _ensure_current(self):
+        stamp = self._file_stamp()
+        if stamp == self._stamp:
+            return
+        with self._lock:
+            if stamp != self._stamp:
+                self._load(stamp)
+
+    def _load(self, stamp):
+        mapping = {}
+        if stamp is not None:
+            try:
+                with open(self.path, 'r') as f:
+                    mapping = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"[WorkflowSummary][LicenseLookup] Could not load {self.path}: {e}")
+
+        exact, stems, normalized, prefixes, globs, hashes = {}, {}, {}, {}, [], {}
+        for key, license_val in mapping.items():
+            if key.lower().startswith(HASH_KEY_PREFIX):
+                hashes[key[len(HASH_KEY_PREFIX):].strip().lower()] = license_val
+                continue
+            if GLOB_CHARS.search(key):
+                if key.endswith('*') and not GLOB_CHARS.search(key[:-1]):
+                    prefixes.setdefault(key[:-1].lower(), license_val)
+                else:
+                    globs.append((re.compile(fnmatch.translate(key.lower())), license_val))
+                continue
+            exact.setdefault(key, license_val)
+            exact.setdefault(os.path.basename(key), license_val)
+            stems.setdefault(_stem(key).lower(), license_val)
+            normalized.setdefault(normalize_model_name(key), license_val)
+
+        self._exact, self._stems, self._normalized = exact, stems, normalized
+        self._prefixes, self._globs, self._hashes = prefixes, globs, hashes
+        self._max_prefix = max((len(p) for p in prefixes), default=0)
+        self._stamp = stamp
+
+    def lookup(self, model_name):
+        """Returns the mapped license for model_name, or None."""
+        self._ensure_current()
+
+        base_name = os.path.basename(model_name.replace('\\', '/'))
+        for key in (model_name, base_name):
+            if key in self._exact:
+                return self._exact[key]
+        stem = _stem(model_name).lower()
+        if stem in self._stems:
+            return self._stems[stem]
+        normalized = normalize_model_name(model_name)
+        if normalized in self._normalized:
+            return self._normalized[normalized]
+
+        if self._prefixes:
+            lowered = base_name.lower()
+            for length in range(min(len(lowered), self._max_prefix), 0, -1):
+                if lowered[:length] in self._prefixes:
+                    return self._prefixes[lowered[:length]]
+
+        lowered_path = model_name.replace('\\', '/').lower()
+        for pattern, license_val in self._globs:
+            if pattern.match(lowered_path) or pattern.match(base_name.lower()):
+                return license_val
+        return None
+
+    def lookup_hash(self, sha256):
+        """Returns the license mapped to a file's SHA256 (or its short hash), or None."""
+        self._ensure_current()
+        if not sha256 or not self._hashes:
+            return None
+        sha256 = sha256.lower()
+        return self._hashes.get(sha256) or self._hashes.get(sha256[:SHORT_HASH_LENGTH])
+
+
+_index = None
+_index_lock = threading.Lock()
+
+def get_model_license_index():
+    """Returns the index shared by this process."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = ModelLicenseIndex()
+        return _index
@@ -0,0 +1,167 @@
+import os
+import threading
+import folder_paths
+
+# ComfyUI model folders searched for each detected model type, in order
+MODEL_TYPE_FOLDERS = {
+    "checkpoint": ["checkpoints"],
+    "lora": ["loras"],
+    "lycoris": ["loras"],
+    "controlnet": ["controlnet"],
+    "vae": ["vae"],
+    "upscaler": ["upscale_models"],
+    "embedding": ["embeddings"],
+    "face_restoration": ["facerestore_models"],
+    "clip": ["text_encoders", "clip"],
+    "unet": ["diffusion_models", "unet"],
+    "clip_vision": ["clip_vision"],
+    "style_model": ["style_models"],
+    "gligen": ["gligen"],
+    "hypernetwork": ["hypernetworks"],
+}
+MODEL_FOLDERS = list(dict.fromkeys(f for folders in MODEL_TYPE_FOLDERS.values() for f in folders))
+# Model type of each folder; node input schemas name folders, reports name types
+FOLDER_MODEL_TYPES = {}
+for _model_type, _folders in MODEL_TYPE_FOLDERS.items():
+    for _folder in _folders:
+        FOLDER_MODEL_TYPES.setdefault(_folder, _model_type)
+
+
+def model_type_for_folder(folder):
+    """Model type for a folder_paths folder name; other folders are their own type."""
+    return FOLDER_MODEL_TYPES.get(folder, folder)
+
+
+def _normalize_name(model_name):
+    return model_name.replace('\\', '/').strip('/')
+
+
+class ModelPathIndex:
+    """
+    Maps model names as they appear in workflows ("sdxl/foo.safetensors") to files in
+    the ComfyUI model folders, with their size and mtime.
+
+    refresh() walks the folder_paths roots with os.scandir. Each directory's listing
+    is remembered with its mtime, so later refreshes only stat directories and
+    re-list the ones that changed. Lookups are dictionary hits.
+    """
+    def __init__(self, folders=MODEL_FOLDERS):
+        self.folders = list(folders)
+        self._lock = threading.Lock()
+        self._dirs = {}
+        self._files = {}
+        self._roots = None
+
+    def _folder_roots(self, folder):
+        try:
+            return folder_paths.get_folder_paths(folder)
+        except Exception:
+            return []
+
+    def _update_dir(self, directory, seen_dirs, seen_inodes):
+        """Re-lists directory and its subdirectories where their mtime changed. Returns whether any did."""
+        try:
+            st = os.stat(directory)
+        except OSError:
+            return False
+        # Symlinked folders are followed, but each directory is visited once
+        if (st.st_dev, st.st_ino) in seen_inodes:
+            return False
+        seen_inodes.add((st.st_dev, st.st_ino))
+        seen_dirs.add(directory)
+        mtime_ns = st.st_mtime_ns
+
+        changed = False
+        cached = self._dirs.get(directory)
+        if cached is None or cached[0] != mtime_ns:
+            files, subdirs = {}, []
+            try:
+                with os.scandir(directory) as it:
+                    for entry in it:
+                        if entry.name.startswith('.'):
+                            continue
+                        try:
+                            if entry.is_dir():
+                                subdirs.append(entry.name)
+                            elif entry.is_file():
+                                st = entry.stat()
+                                files[entry.name] = {"path": entry.path, "size": st.st_size, "mtime": st.st_mtime}
+                        except OSError:
+                            continue
+            except OSError:
+                return False
+            cached = (mtime_ns, files, sorted(subdirs))
+            self._dirs[directory] = cached
+            changed = True
+
+        for subdir in cached[2]:
+            changed = self._update_dir(os.path.join(directory, subdir), seen_dirs, seen_inodes) or changed
+        return changed
+
+    def _collect(self, directory, prefix, files):
+        cached = self._dirs.get(directory)
+        if cached is None:
+            return
+        for name, entry in cached[1].items():
+            # Like folder_paths.get_full_path, the first root containing a name wins
+            files.setdefault(prefix + name, entry)
+        for subdir in cached[2]:
+            self._collect(os.path.join(directory, subdir), f"{prefix}{subdir}/", files)
+
+    def refresh(self):
+        """Brings the index up to date with the model folders on disk."""
+        with self._lock:
+            roots = {folder: self._folder_roots(folder) for folder in self.folders}
+            seen_dirs, seen_inodes = set(), set()
+            changed = False
+            for folder_roots in roots.values():
+                for root in folder_roots:
+                    changed = self._update_dir(root, seen_dirs, seen_inodes) or changed
+            removed = set(self._dirs) - seen_dirs
+            for directory in removed:
+                del self._dirs[directory]
+            if not changed and not removed and self._roots == roots:
+                return
+
+            index = {}
+            for folder, folder_roots in roots.items():
+                files = {}
+                for root in folder_roots:
+                    self._collect(root, "", files)
+                index[folder] = files
+            self._files = index
+            self._roots = roots
+
+    def find(self, model_name, model_type=None):
+        """
+        Returns {"path", "size", "mtime"} for a model, searching the folders of its
+        type (or every model folder, then the folder named like the type, for other
+        types), or None.
+        """
+        name = _normalize_name(model_name)
+        for folder in MODEL_TYPE_FOLDERS.get(model_type, self.folders):
+            entry = self._files.get(folder, {}).get(name)
+            if entry:
+                return entry
+        if model_type and model_type not in MODEL_TYPE_FOLDERS:
+            # Folders registered by custom nodes ("ipadapter", ...) are not indexed
+            try:
+                path = folder_paths.get_full_path(model_type, model_name)
+                st = os.stat(path) if path else None
+            except Exception:
+                return None
+            if st:
+                return {"path": path, "size": st.st_size, "mtime": st.st_mtime}
+        return None
+
+
+_index = None
+_index_lock = threading.Lock()
+
+def get_model_path_index():
+    """Returns the index shared by this process."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = ModelPathIndex()
+        return _index
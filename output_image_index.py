@@ -0,0 +1,129 @@
+import os
+import re
+import heapq
+import fnmatch
+import threading
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+# Candidates kept per prefix; older images of the same prefix are dropped from the index
+NEWEST_PER_PREFIX = 8
+
+# SaveImage writes "<filename>_<counter:05>_.png" into the prefix's subfolder
+COUNTER_SUFFIX_REGEX = re.compile(r"_\d{5,}_?$")
+# Placeholders ComfyUI expands on the server (%year%, %width%, ...)
+PLACEHOLDER_REGEX = re.compile(r"%[^%]+%")
+
+
+def _prefix_key(filename):
+    """The filename_prefix part of an output file name."""
+    stem = os.path.splitext(filename)[0]
+    return COUNTER_SUFFIX_REGEX.sub("", stem)
+
+
+class OutputImageIndex:
+    """
+    Index of the images in ComfyUI's output folder by SaveImage filename prefix.
+
+    Only the subfolders that prefixes point to are listed, with os.scandir. Each
+    listing is kept with the directory's mtime: unchanged directories are not
+    listed again, and changed ones reuse the stats of files seen before. Per prefix,
+    a bounded heap keeps the NEWEST_PER_PREFIX most recent images.
+    """
+    def __init__(self, output_dir, keep=NEWEST_PER_PREFIX):
+        self.output_dir = output_dir
+        self.keep = keep
+        self._lock = threading.Lock()
+        # directory -> (mtime_ns, {file name: mtime}, {prefix key: min-heap of (mtime, file name)})
+        self._dirs = {}
+
+    def _directory(self, directory):
+        try:
+            mtime_ns = os.stat(directory).st_mtime_ns
+        except OSError:
+            self._dirs.pop(directory, None)
+            return None
+        cached = self._dirs.get(directory)
+        if cached and cached[0] == mtime_ns:
+            return cached
+
+        known = cached[1] if cached else {}
+        files, prefixes = {}, {}
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    name = entry.name
+                    if not name.lower().endswith(IMAGE_EXTENSIONS):
+                        continue
+                    mtime = known.get(name)
+                    if mtime is None:
+                        try:
+                            if not entry.is_file():
+                                continue
+                            mtime = entry.stat().st_mtime
+                        except OSError:
+                            continue
+                    files[name] = mtime
+                    heap = prefixes.setdefault(_prefix_key(name), [])
+                    if len(heap) < self.keep:
+                        heapq.heappush(heap, (mtime, name))
+                    elif (mtime, name) > heap[0]:
+                        heapq.heapreplace(heap, (mtime, name))
+        except OSError:
+            return None
+        cached = (mtime_ns, files, prefixes)
+        self._dirs[directory] = cached
+        return cached
+
+    def _matching_dirs(self, subfolder):
+        """Directories under the output folder matching a subfolder, which may hold placeholders."""
+        directories = [self.output_dir]
+        for part in [p for p in subfolder.replace('\\', '/').split('/') if p]:
+            if part == '..':
+                # ComfyUI refuses to save outside the output folder
+                return []
+            if not PLACEHOLDER_REGEX.search(part):
+                directories = [os.path.join(d, part) for d in directories]
+                continue
+            pattern = PLACEHOLDER_REGEX.sub('*', part)
+            matched = []
+            for directory in directories:
+                try:
+                    with os.scandir(directory) as it:
+                        matched.extend(e.path for e in it if e.is_dir() and fnmatch.fnmatchcase(e.name, pattern))
+                except OSError:
+                    continue
+            directories = matched
+        return directories
+
+    def newest(self, filename_prefix, count=None):
+        """Paths of the newest images written for a SaveImage filename_prefix, newest first."""
+        subfolder, filename = os.path.split(filename_prefix.replace('\\', '/'))
+        pattern = PLACEHOLDER_REGEX.sub('*', filename) if PLACEHOLDER_REGEX.search(filename) else None
+
+        candidates = []
+        with self._lock:
+            for directory in self._matching_dirs(subfolder):
+                cached = self._directory(directory)
+                if cached is None:
+                    continue
+                prefixes = cached[2]
+                if pattern is None:
+                    heaps = [prefixes.get(filename, [])]
+                else:
+                    heaps = [heap for key, heap in prefixes.items() if fnmatch.fnmatchcase(key, pattern)]
+                for heap in heaps:
+                    candidates.extend((mtime, os.path.join(directory, name)) for mtime, name in heap)
+        newest = heapq.nlargest(count or self.keep, candidates)
+        return [path for _, path in newest]
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+def get_output_image_index(output_dir):
+    """Returns the index of an output folder shared by this process."""
+    output_dir = os.path.abspath(output_dir)
+    with _indexes_lock:
+        if output_dir not in _indexes:
+            _indexes[output_dir] = OutputImageIndex(output_dir)
+        return _indexes[output_dir]
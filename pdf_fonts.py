@@ -0,0 +1,133 @@
+import os
+import sys
+import threading
+
+# Family name the report's PDF class sets its text in
+FONT_FAMILY = 'HelveticaUnicode'
+STYLES = ('', 'B', 'I', 'BI')
+# DejaVu Sans ships with the node, so reports can be generated without any system font
+BUNDLED_FONT_DIR = os.path.join(os.path.dirname(__file__), 'fonts')
+FONT_EXTENSIONS = ('.ttf', '.ttc', '.otf')
+
+# Font files to use per style, by family in order of preference; file names are matched
+# case-insensitively. A family needs its regular face; missing styles reuse the closest
+# one. Helvetica.ttc is read from its first face for every style.
+FONT_FAMILIES = [
+    ("Helvetica", {'': ["helvetica.ttc"]}),
+    ("Arial", {
+        '': ["arial.ttf"],
+        'B': ["arial bold.ttf", "arialbd.ttf"],
+        'I': ["arial italic.ttf", "ariali.ttf"],
+        'BI': ["arial bold italic.ttf", "arialbi.ttf"],
+    }),
+    ("DejaVu Sans", {
+        '': ["dejavusans.ttf"],
+        'B': ["dejavusans-bold.ttf"],
+        'I': ["dejavusans-oblique.ttf"],
+        'BI': ["dejavusans-boldoblique.ttf"],
+    }),
+    ("Liberation Sans", {
+        '': ["liberationsans-regular.ttf"],
+        'B': ["liberationsans-bold.ttf"],
+        'I': ["liberationsans-italic.ttf"],
+        'BI': ["liberationsans-bolditalic.ttf"],
+    }),
+    ("Noto Sans", {
+        '': ["notosans-regular.ttf"],
+        'B': ["notosans-bold.ttf"],
+        'I': ["notosans-italic.ttf"],
+        'BI': ["notosans-bolditalic.ttf"],
+    }),
+]
+STYLE_FALLBACKS = {'B': [''], 'I': [''], 'BI': ['B', 'I', '']}
+
+
+def system_font_dirs():
+    """Font directories of this platform, user directories last. WORKFLOW_SUMMARY_FONT_DIR is searched first."""
+    home = os.path.expanduser('~')
+    dirs = [os.environ.get('WORKFLOW_SUMMARY_FONT_DIR')]
+    if sys.platform == 'darwin':
+        dirs += ['/System/Library/Fonts', '/System/Library/Fonts/Supplemental', '/Library/Fonts',
+                 os.path.join(home, 'Library', 'Fonts')]
+    elif sys.platform == 'win32':
+        dirs += [os.path.join(os.environ.get('WINDIR', r'C:\Windows'), 'Fonts'),
+                 os.path.join(os.environ.get('LOCALAPPDATA', ''), 'Microsoft', 'Windows', 'Fonts')]
+    else:
+        dirs += ['/usr/share/fonts', '/usr/local/share/fonts', os.path.join(home, '.local', 'share', 'fonts'),
+                 os.path.join(home, '.fonts')]
+    return [d for d in dirs if d and os.path.isdir(d)]
+
+
+class FontProvider:
+    """
+    Finds the report font on any platform and registers it on PDF documents.
+
+    Font directories are indexed and the font files resolved once per process; each
+    document registers the resolved files with fpdf's add_font. Parsed fonts are not
+    shared between documents: fpdf keeps per-document state (subset, object numbers)
+    in them and has no public way to copy one, and parsing DejaVu Sans takes about
+    50 ms per style, with at most two styles per report. Only the glyphs a report
+    uses are embedded.
+    """
+    def __init__(self, search_dirs=None, bundled_dir=BUNDLED_FONT_DIR):
+        self.search_dirs = search_dirs
+        self.bundled_dir = bundled_dir
+        self._lock = threading.Lock()
+        self._files = None
+        self._resolved = None
+
+    def _index_fonts(self):
+        files = {}
+        for font_dir in (self.search_dirs if self.search_dirs is not None else system_font_dirs()) + [self.bundled_dir]:
+            for root, _, names in os.walk(font_dir):
+                for name in names:
+                    if name.lower().endswith(FONT_EXTENSIONS):
+                        files.setdefault(name.lower(), os.path.join(root, name))
+        return files
+
+    def resolve(self):
+        """{style: font file} for the first family whose regular face is installed, or {}."""
+        with self._lock:
+            if self._resolved is None:
+                self._files = self._index_fonts()
+                self._resolved = {}
+                for family, styles in FONT_FAMILIES:
+                    found = {}
+                    for style, names in styles.items():
+                        path = next((self._files[n] for n in names if n in self._files), None)
+                        if path:
+                            found[style] = path
+                    if '' in found:
+                        for style in STYLES:
+                            if style not in found:
+                                found[style] = next(found[s] for s in STYLE_FALLBACKS[style] if s in found)
+                        self._resolved = found
+                        print(f"[WorkflowSummary][Fonts] Using {family} ({found['']})")
+                        break
+            return self._resolved
+
+    def register(self, pdf, family=FONT_FAMILY, styles=STYLES):
+        """
+        Registers styles of the resolved font on pdf under family. fpdf embeds every
+        registered font, so documents can register each style when it is first used.
+        """
+        fonts = self.resolve()
+        if not fonts:
+            raise FileNotFoundError(f"No usable font found in {system_font_dirs() + [self.bundled_dir]}")
+        for style in styles:
+            style = ''.join(sorted(style.upper().replace('U', '').replace('S', '')))
+            if f"{family.lower()}{style}" in pdf.fonts:
+                continue
+            pdf.add_font(family, style, fonts[style])
+
+
+_provider = None
+_provider_lock = threading.Lock()
+
+def get_font_provider():
+    """Returns the font provider shared by this process."""
+    global _provider
+    with _provider_lock:
+        if _provider is None:
+            _provider = FontProvider()
+        return _provider
@@ -0,0 +1,106 @@
+import io
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image
+
+# Resolution images are prepared at for the width they take up on the page
+IMAGE_DPI = int(os.environ.get("WORKFLOW_SUMMARY_IMAGE_DPI", 150))
+JPEG_QUALITY = 85
+IMAGE_WORKERS = 4
+# Prepared images kept in memory; one is typically 100-300 KB
+MAX_CACHED_IMAGES = 64
+MM_PER_INCH = 25.4
+
+
+class PreparedImage:
+    """An image ready for pdf.image(): encoded bytes, or the error that prevented it."""
+    def __init__(self, data=None, error=None):
+        self.data = data
+        self.error = error
+
+    def stream(self):
+        return io.BytesIO(self.data)
+
+
+def prepare_image(path, width_mm, dpi=IMAGE_DPI, quality=JPEG_QUALITY):
+    """
+    Downsamples an image to the pixel width it needs at dpi when printed width_mm wide
+    and re-encodes it: JPEG for opaque images, which fpdf embeds without decoding, and
+    an optimized PNG for images with transparency. Returns the encoded bytes.
+    """
+    max_width = max(1, round(width_mm / MM_PER_INCH * dpi))
+    with Image.open(path) as image:
+        image.draft('RGB', (max_width, max_width * image.height // max(1, image.width)))
+        has_alpha = image.mode in ('RGBA', 'LA', 'PA') or (image.mode == 'P' and 'transparency' in image.info)
+        image = image.convert('RGBA' if has_alpha else 'RGB')
+        if image.width > max_width:
+            height = max(1, round(image.height * max_width / image.width))
+            image = image.resize((max_width, height), Image.LANCZOS)
+        out = io.BytesIO()
+        if has_alpha:
+            image.save(out, format='PNG', optimize=True)
+        else:
+            image.save(out, format='JPEG', quality=quality, optimize=True)
+    return out.getvalue()
+
+
+class PdfImagePreparer:
+    """
+    Prepares output images for embedding, in a thread pool (Pillow releases the GIL
+    while decoding, resizing and encoding). Results are cached in memory by source
+    file (path, size, mtime) and settings, so an image is prepared once per version.
+    """
+    def __init__(self, dpi=IMAGE_DPI, quality=JPEG_QUALITY, workers=IMAGE_WORKERS, max_cached=MAX_CACHED_IMAGES):
+        self.dpi = dpi
+        self.quality = quality
+        self.workers = workers
+        self.max_cached = max_cached
+        self._lock = threading.Lock()
+        self._cache = OrderedDict()
+
+    def _key(self, path, width_mm):
+        st = os.stat(path)
+        return (os.path.abspath(path), st.st_size, st.st_mtime_ns, round(width_mm, 2), self.dpi, self.quality)
+
+    def prepare(self, path, width_mm):
+        """Returns a PreparedImage for path printed width_mm wide."""
+        try:
+            key = self._key(path, width_mm)
+        except OSError as e:
+            return PreparedImage(error=e)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+        try:
+            prepared = PreparedImage(data=prepare_image(path, width_mm, self.dpi, self.quality))
+        except Exception as e:
+            # Errors are not cached; the file may be complete on the next export
+            return PreparedImage(error=e)
+        with self._lock:
+            self._cache[key] = prepared
+            while len(self._cache) > self.max_cached:
+                self._cache.popitem(last=False)
+        return prepared
+
+    def prepare_all(self, paths, width_mm):
+        """{path: PreparedImage} for every path, prepared concurrently."""
+        paths = list(dict.fromkeys(paths))
+        if len(paths) <= 1:
+            return {path: self.prepare(path, width_mm) for path in paths}
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(paths))) as pool:
+            return dict(zip(paths, pool.map(lambda path: self.prepare(path, width_mm), paths)))
+
+
+_preparer = None
+_preparer_lock = threading.Lock()
+
+def get_pdf_image_preparer():
+    """Returns the image preparer shared by this process."""
+    global _preparer
+    with _preparer_lock:
+        if _preparer is None:
+            _preparer = PdfImagePreparer()
+        return _preparer
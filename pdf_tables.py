@@ -0,0 +1,138 @@
+# Compact table layout for long report sections. Rows are drawn straight into the page
+# content stream with FPDF.text(), without the line-breaking machinery of write() and
+# multi_cell(), so tables with tens of thousands of rows render in seconds.
+
+TABLE_FONT_SIZE = 7  # pt
+CELL_PADDING = 1.0  # mm, left and right of each cell
+ROW_PADDING = 0.5  # mm, above and below each row
+BAND_GAP = 6  # mm between side-by-side bands
+# Longer cell texts are cut with an ellipsis so a row always fits on a page
+MAX_CELL_LINES = 8
+PT_TO_MM = 25.4 / 72
+
+
+class TableColumn:
+    """A table column: its title and its share of the band width."""
+    def __init__(self, title, weight=1.0):
+        self.title = title
+        self.weight = weight
+
+
+class _TextWrapper:
+    """Greedy word wrap using the current font's advance widths, memoized per word."""
+    def __init__(self, pdf):
+        self.pdf = pdf
+        self._widths = {}
+        self.space = self.width(' ')
+
+    def width(self, text):
+        try:
+            return self._widths[text]
+        except KeyError:
+            width = self._widths[text] = self.pdf.get_string_width(text)
+            if len(self._widths) > 50000:
+                self._widths.clear()
+            return width
+
+    def _fit_chars(self, word, width):
+        """Longest prefix of word that fits in width (at least one character)."""
+        used = 0
+        for i, char in enumerate(word):
+            used += self.width(char)
+            if used > width:
+                return max(i, 1)
+        return len(word)
+
+    def wrap(self, text, width, max_lines=MAX_CELL_LINES):
+        if self.width(text) <= width:
+            return [text]
+        lines, line, line_width = [], '', 0
+        for word in text.split(' '):
+            word_width = self.width(word)
+            if line and line_width + self.space + word_width <= width:
+                line, line_width = f"{line} {word}", line_width + self.space + word_width
+                continue
+            if line:
+                lines.append(line)
+            while word_width > width:
+                cut = self._fit_chars(word, width)
+                lines.append(word[:cut])
+                word = word[cut:]
+                word_width = self.width(word)
+            line, line_width = word, word_width
+        if line:
+            lines.append(line)
+        if len(lines) > max_lines:
+            lines = lines[:max_lines]
+            lines[-1] = lines[-1][:max(1, len(lines[-1]) - 1)] + '…'
+        return lines
+
+
+def render_table(pdf, family, columns, rows, bands=1, font_size=TABLE_FONT_SIZE):
+    """
+    Draws rows (any iterable of tuples of cell texts, e.g. a generator) as a table
+    with a bold header row, starting at the current position. With bands > 1 the
+    page is split into that many side-by-side copies of the table, filled left to
+    right, so narrow tables take a fraction of the pages. Rows are consumed one at a
+    time; nothing beyond the current row is kept. Returns the number of rows drawn.
+    """
+    line_height = font_size * PT_TO_MM * 1.2
+    ascent = font_size * PT_TO_MM * 0.8
+    left = pdf.l_margin
+    band_width = (pdf.w - pdf.l_margin - pdf.r_margin - BAND_GAP * (bands - 1)) / bands
+    total_weight = sum(column.weight for column in columns) or 1
+    widths = [band_width * column.weight / total_weight for column in columns]
+    offsets = [sum(widths[:i]) for i in range(len(widths))]
+    text_widths = [max(1.0, width - 2 * CELL_PADDING) for width in widths]
+
+    if pdf.get_y() + 3 * line_height > pdf.page_break_trigger:
+        pdf.add_page()
+    pdf.set_font(family, '', font_size)
+    wrapper = _TextWrapper(pdf)
+    state = {'band': 0, 'top': pdf.get_y(), 'bottom': pdf.get_y()}
+
+    def band_x():
+        return left + state['band'] * (band_width + BAND_GAP)
+
+    def draw_row(cells, y):
+        x = band_x()
+        height = 0
+        for offset, width, lines in zip(offsets, text_widths, cells):
+            for i, line in enumerate(lines):
+                pdf.text(x + offset + CELL_PADDING, y + ROW_PADDING + ascent + i * line_height, line)
+            height = max(height, len(lines))
+        return height * line_height + 2 * ROW_PADDING
+
+    def draw_header(y):
+        pdf.set_font(family, 'B', font_size)
+        header = [[column.title] for column in columns]
+        height = draw_row(header, y)
+        pdf.set_draw_color(160, 160, 160)
+        pdf.line(band_x(), y + height, band_x() + band_width, y + height)
+        pdf.set_font(family, '', font_size)
+        return y + height
+
+    def next_band():
+        if state['band'] + 1 < bands:
+            state['band'] += 1
+        else:
+            pdf.add_page()
+            pdf.set_font(family, '', font_size)
+            state['band'] = 0
+            state['top'] = state['bottom'] = pdf.get_y()
+        return draw_header(state['top'])
+
+    y = draw_header(state['top'])
+    count = 0
+    for row in rows:
+        cells = [wrapper.wrap(str(text), width) for text, width in zip(row, text_widths)]
+        height = max(len(lines) for lines in cells) * line_height + 2 * ROW_PADDING
+        if y + height > pdf.page_break_trigger:
+            y = next_band()
+        draw_row(cells, y)
+        y += height
+        state['bottom'] = max(state['bottom'], y)
+        count += 1
+
+    pdf.set_xy(left, state['bottom'] + 2)
+    return count
@@ -0,0 +1,125 @@
+import os
+import json
+import zlib
+import struct
+import hashlib
+import threading
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+TEXT_CHUNKS = (b'tEXt', b'zTXt', b'iTXt')
+# Text chunks must come before the image data; reading stops at the first of these
+END_CHUNKS = (b'IDAT', b'IEND')
+# Larger text chunks are skipped rather than read into memory
+MAX_TEXT_CHUNK = 64 * 1024 * 1024
+# ComfyUI's SaveImage stores the executed (API-format) prompt under this keyword
+PROMPT_KEYWORD = "prompt"
+
+
+def _decode_text_chunk(chunk_type, data):
+    """(keyword, text) of a tEXt, zTXt or iTXt chunk."""
+    keyword, _, rest = data.partition(b'\0')
+    keyword = keyword.decode('latin-1')
+    if chunk_type == b'tEXt':
+        return keyword, rest.decode('latin-1')
+    if chunk_type == b'zTXt':
+        # One compression method byte (0 = zlib), then the compressed text
+        return keyword, zlib.decompress(rest[1:]).decode('latin-1')
+    # iTXt: compression flag, method, language tag\0, translated keyword\0, UTF-8 text
+    compressed = rest[:1] == b'\x01'
+    _, _, rest = rest[2:].partition(b'\0')
+    _, _, text = rest.partition(b'\0')
+    if compressed:
+        text = zlib.decompress(text)
+    return keyword, text.decode('utf-8')
+
+
+def read_png_text(path, keywords=None):
+    """
+    Returns the text chunks of a PNG file as {keyword: text}, or None when it is not a
+    PNG. Only the chunk headers and the text chunks before the first IDAT are read;
+    other chunks are skipped with a seek and the pixel data is never touched. With
+    keywords, other text chunks are skipped too.
+    """
+    texts = {}
+    with open(path, 'rb') as f:
+        if f.read(8) != PNG_SIGNATURE:
+            return None
+        while True:
+            header = f.read(8)
+            if len(header) != 8:
+                break
+            length, chunk_type = struct.unpack('>I4s', header)
+            if chunk_type in END_CHUNKS:
+                break
+            if chunk_type not in TEXT_CHUNKS or length > MAX_TEXT_CHUNK:
+                f.seek(length + 4, os.SEEK_CUR)
+                continue
+            data = f.read(length)
+            crc = f.read(4)
+            if len(data) != length or len(crc) != 4:
+                break
+            if struct.unpack('>I', crc)[0] != zlib.crc32(chunk_type + data):
+                continue
+            if keywords is not None and data.partition(b'\0')[0].decode('latin-1') not in keywords:
+                continue
+            try:
+                keyword, text = _decode_text_chunk(chunk_type, data)
+            except (zlib.error, UnicodeDecodeError):
+                continue
+            texts.setdefault(keyword, text)
+    return texts
+
+
+def prompt_digest(prompt):
+    """Digest of an API-format prompt that does not depend on key order or formatting."""
+    canonical = json.dumps(prompt, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+class PngPromptCache:
+    """
+    Digest of the prompt embedded in each output image, by (path, size, mtime). Output
+    images are checked once per version, however many exports consider them.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._digests = {}
+
+    def digest(self, image_path):
+        """
+        Prompt digest of an image; None when it carries no prompt (not a PNG, or saved
+        with metadata disabled) or cannot be read.
+        """
+        try:
+            st = os.stat(image_path)
+        except OSError:
+            return None
+        stamp = (st.st_size, st.st_mtime_ns)
+        with self._lock:
+            cached = self._digests.get(image_path)
+        if cached and cached[0] == stamp:
+            return cached[1]
+
+        digest = None
+        if image_path.lower().endswith('.png'):
+            try:
+                texts = read_png_text(image_path, keywords=(PROMPT_KEYWORD,))
+                if texts and PROMPT_KEYWORD in texts:
+                    digest = prompt_digest(json.loads(texts[PROMPT_KEYWORD]))
+            except (OSError, ValueError) as e:
+                print(f"[WorkflowSummary][OutputImages] Could not read metadata of {image_path}: {e}")
+        with self._lock:
+            self._digests[image_path] = (stamp, digest)
+        return digest
+
+
+_prompt_cache = None
+_prompt_cache_lock = threading.Lock()
+
+def get_png_prompt_cache():
+    """Returns the cache shared by this process."""
+    global _prompt_cache
+    with _prompt_cache_lock:
+        if _prompt_cache is None:
+            _prompt_cache = PngPromptCache()
+        return _prompt_cache
@@ -0,0 +1,104 @@
+# Literal inputs that hold prompt text, in order of preference. CLIPTextEncodeSDXL uses
+# text_g/text_l, CLIPTextEncodeFlux clip_l/t5xxl, primitive string nodes value/string.
+TEXT_INPUT_NAMES = ("text", "text_g", "text_l", "t5xxl", "clip_l", "prompt", "string", "value")
+
+# Sampler or guider inputs that carry each prompt. SamplerCustomAdvanced takes a
+# "guider"; CFGGuider has positive/negative, BasicGuider a single conditioning.
+ROLE_INPUTS = {
+    "positive": ("positive", "conditioning", "cond1"),
+    "negative": ("negative",),
+}
+GUIDER_INPUT = "guider"
+
+# Nodes with both inputs (ControlNetApplyAdvanced, InpaintModelConditioning, ...) pass
+# them through as outputs 0 and 1
+BRANCHES = ("positive", "negative")
+
+
+class PromptTracer:
+    """
+    Attributes prompts to samplers on the API-format graph of a WorkflowGraph.
+
+    One pass over the nodes in topological order records, for every node and branch,
+    the nearest prompt text upstream of it, so a text encoder shared by many samplers
+    is resolved once. Lookups per (node, input) are then memoized dict hits.
+    """
+    def __init__(self, graph):
+        self.graph = graph
+        self._text = {}
+        self._input_text = {}
+        self._trace_all()
+
+    def node_text(self, node_id):
+        """Prompt text held directly by a node's literal inputs, or None."""
+        for input_name in TEXT_INPUT_NAMES:
+            value = self.graph.literal(node_id, input_name)
+            if isinstance(value, str) and value.strip():
+                return value
+        return None
+
+    def _is_branching(self, node_id):
+        return all(self.graph.source(node_id, branch) for branch in BRANCHES)
+
+    def _source_text(self, node_id, input_name):
+        link = self.graph.source(node_id, input_name)
+        if link is None:
+            return None
+        source_id, output_index = link
+        branch = None
+        if output_index < len(BRANCHES) and self._is_branching(source_id):
+            branch = BRANCHES[output_index]
+        return self._text.get((source_id, branch))
+
+    def _trace_all(self):
+        graph = self.graph
+        for node_id in graph.topological_order():
+            own_text = self.node_text(node_id)
+            if own_text is not None:
+                self._text[(node_id, None)] = own_text
+                continue
+            if self._is_branching(node_id):
+                for branch in BRANCHES:
+                    self._text[(node_id, branch)] = self._source_text(node_id, branch)
+                self._text[(node_id, None)] = self._text[(node_id, BRANCHES[0])]
+                continue
+
+            # Text inputs first (CLIPTextEncode fed by a primitive), then any other link
+            inputs = sorted(graph.links.get(node_id, {}), key=lambda name: name not in TEXT_INPUT_NAMES)
+            for input_name in inputs:
+                text = self._source_text(node_id, input_name)
+                if text is not None:
+                    self._text[(node_id, None)] = text
+                    break
+
+    def input_text(self, node_id, input_name):
+        """Nearest prompt text upstream of one input of a node, or None."""
+        key = (str(node_id), input_name)
+        if key not in self._input_text:
+            self._input_text[key] = self._source_text(key[0], input_name)
+        return self._input_text[key]
+
+    def is_sampler(self, node_id):
+        links = self.graph.links.get(str(node_id), {})
+        return GUIDER_INPUT in links or "positive" in links
+
+    def sampler_prompts(self, sampler_id):
+        """{"positive", "negative"} texts of a sampler (or of the guider feeding it)."""
+        conditioned_id = sampler_id
+        guider = self.graph.source(sampler_id, GUIDER_INPUT)
+        if guider:
+            conditioned_id = guider[0]
+
+        prompts = {}
+        links = self.graph.links.get(str(conditioned_id), {})
+        for role, input_names in ROLE_INPUTS.items():
+            for input_name in input_names:
+                if input_name in links:
+                    prompts[role] = self.input_text(conditioned_id, input_name)
+                    break
+        return prompts
+
+    def prompts_for(self, node_id):
+        """Prompts of the nearest sampler upstream of an output node; {} when there is none."""
+        sampler_id = self.graph.find_ancestor(node_id, self.is_sampler)
+        return self.sampler_prompts(sampler_id) if sampler_id else {}
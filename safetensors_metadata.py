@@ -0,0 +1,143 @@
+import os
+import json
+import struct
+import sqlite3
+import threading
+from .model_hasher import CACHE_FILE
+
+# The safetensors format caps the JSON header at 100 MB; anything larger is not a safetensors file
+MAX_HEADER_SIZE = 100 * 1024 * 1024
+METADATA_KEY = b'"__metadata__"'
+
+# Provenance fields returned to the resolver, first key present wins. modelspec is the
+# Stability AI model card standard; kohya-ss trainers write the ss_* keys on LoRAs.
+PROVENANCE_FIELDS = {
+    "license": ["modelspec.license", "license"],
+    "author": ["modelspec.author", "author"],
+    "architecture": ["modelspec.architecture", "ss_base_model_version"],
+    "title": ["modelspec.title", "ss_output_name"],
+}
+
+
+def _read_header(path):
+    """Reads the JSON header of a safetensors file: the 8-byte length prefix, then the header bytes only."""
+    with open(path, 'rb') as f:
+        prefix = f.read(8)
+        if len(prefix) != 8:
+            return None
+        (length,) = struct.unpack('<Q', prefix)
+        if length > MAX_HEADER_SIZE:
+            return None
+        header = f.read(length)
+    return header if len(header) == length else None
+
+
+def _raw_metadata(header):
+    """
+    The __metadata__ object of a header. Tensor entries make up nearly all of a header,
+    so the metadata object is decoded on its own; the full header is parsed only when
+    that fails.
+    """
+    start = header.find(METADATA_KEY)
+    if start != -1:
+        colon = header.find(b':', start + len(METADATA_KEY))
+        try:
+            if colon == -1:
+                raise ValueError("no value after __metadata__")
+            text = header[colon + 1:].decode('utf-8')
+            metadata, _ = json.JSONDecoder().raw_decode(text.lstrip())
+            if isinstance(metadata, dict):
+                return metadata
+        except ValueError:
+            pass
+    try:
+        metadata = json.loads(header).get("__metadata__", {})
+    except (ValueError, AttributeError):
+        return {}
+    return metadata if isinstance(metadata, dict) else {}
+
+
+def read_safetensors_metadata(path):
+    """
+    Returns the provenance fields (license, author, architecture, title) embedded in a
+    safetensors file, leaving out missing ones, or None when the file is not a valid
+    safetensors file.
+    """
+    header = _read_header(path)
+    if header is None:
+        return None
+    metadata = _raw_metadata(header)
+    fields = {}
+    for field, keys in PROVENANCE_FIELDS.items():
+        for key in keys:
+            value = metadata.get(key)
+            if isinstance(value, str) and value.strip():
+                fields[field] = value.strip()
+                break
+    return fields
+
+
+class SafetensorsMetadataCache:
+    """
+    Embedded safetensors metadata by (path, size, mtime), kept in memory and in the
+    model file cache so each file version's header is read once.
+    """
+    def __init__(self, path=CACHE_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._memory = {}
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS safetensors_metadata ("
+            " path TEXT PRIMARY KEY,"
+            " size INTEGER NOT NULL,"
+            " mtime_ns INTEGER NOT NULL,"
+            " fields TEXT)"
+        )
+        self._conn.commit()
+
+    def get(self, model_path):
+        """Provenance fields of a model file; {} for files without any, None for non-safetensors files."""
+        if not model_path or not model_path.lower().endswith('.safetensors'):
+            return None
+        model_path = os.path.abspath(model_path)
+        try:
+            st = os.stat(model_path)
+        except OSError:
+            return None
+        key = (model_path, st.st_size, st.st_mtime_ns)
+        if key in self._memory:
+            return self._memory[key]
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT fields FROM safetensors_metadata WHERE path = ? AND size = ? AND mtime_ns = ?", key
+            ).fetchone()
+        if row:
+            fields = json.loads(row[0]) if row[0] is not None else None
+        else:
+            try:
+                fields = read_safetensors_metadata(model_path)
+            except OSError as e:
+                print(f"[WorkflowSummary][ModelMetadata] Could not read {model_path}: {e}")
+                return None
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO safetensors_metadata (path, size, mtime_ns, fields) VALUES (?, ?, ?, ?)",
+                    key + (json.dumps(fields) if fields is not None else None,)
+                )
+                self._conn.commit()
+        self._memory[key] = fields
+        return fields
+
+
+_metadata_cache = None
+_metadata_cache_lock = threading.Lock()
+
+def get_safetensors_metadata_cache():
+    """Returns the metadata cache shared by this process."""
+    global _metadata_cache
+    with _metadata_cache_lock:
+        if _metadata_cache is None:
+            _metadata_cache = SafetensorsMetadataCache()
+        return _metadata_cache
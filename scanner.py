@@ -1,13 +1,419 @@
 import os
+import ast
 import json
 import re
+import hashlib
+import mmap
+import fnmatch
+import threading
+import sys
+import configparser
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait
 import folder_paths
+from .license_classifier import get_license_classifier, normalize_license_name, COPYRIGHT_LINE_REGEX
+
+MANIFEST_VERSION = 4
+
+# Parallel scan settings: below PARALLEL_MIN_FILES changed files the pool start-up
+# cost outweighs the gain, so the scan stays serial.
+DEFAULT_SCAN_WORKERS = min(8, os.cpu_count() or 1)
+PARALLEL_MIN_FILES = 200
+# A parallel scan that has not finished by then is abandoned for the serial path
+SCAN_POOL_TIMEOUT = 120  # seconds
+
+
+def _scan_executor(workers):
+    """
+    Pool for the parallel scan. Worker processes are only forked from a single-threaded
+    process (a standalone scan): inside ComfyUI the server and prompt worker threads
+    may hold locks at fork time that a child would then wait on forever, and spawn
+    (default on Windows and macOS) re-imports ComfyUI's main.py in every worker. In
+    every other case the scan runs on threads.
+    """
+    if (threading.active_count() == 1 and sys.platform != 'darwin'
+            and 'fork' in multiprocessing.get_all_start_methods()):
+        return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('fork'))
+    return ThreadPoolExecutor(max_workers=workers, thread_name_prefix="node-scan")
+
+# Directories that never contain node definitions worth scanning. Extra patterns can
+# be added through the "ignore" list in scanner_config.json; .gitignore files inside
+# node packs are honoured as well.
+DEFAULT_IGNORE_PATTERNS = [
+    '.git/', '.github/', '.hg/', '.svn/', '__pycache__/', '.mypy_cache/', '.pytest_cache/',
+    '.ruff_cache/', '.tox/', '.nox/', 'node_modules/', 'venv/', '.venv/', 'env/',
+    'site-packages/', '*.egg-info/', 'tests/', 'test/', 'fixtures/',
+    'models/', 'weights/', 'checkpoints/', 'ckpts/',
+]
+
+# Files at the root of a node pack that describe its license
+LICENSE_FILE_REGEX = re.compile(r"^(licen[cs]e|copying)([.\-_].*)?$", re.IGNORECASE)
+LICENSE_METADATA_FILES = ('pyproject.toml', 'setup.cfg')
+
+# Regex patterns for finding node mappings
+NODE_MAPPING_MARKER = b"NODE_CLASS_MAPPINGS"
+NODE_MAPPING_REGEX = re.compile(r"NODE_CLASS_MAPPINGS\s*=\s*\{([^}]+)\}", re.DOTALL)
+CLASS_NAME_REGEX = re.compile(r"['\"]([^'\"]+)['\"]\s*:")
+# "Name": ClassName or "Name": module.ClassName entries of a mapping
+CLASS_ENTRY_REGEX = re.compile(r"['\"]([^'\"]+)['\"]\s*:\s*([A-Za-z_][\w.]*)")
+# Inputs listing model files call folder_paths.get_filename_list("<folder>") in INPUT_TYPES
+INPUT_SCHEMA_MARKER = b"get_filename_list"
+
+def _parse_ignore_pattern(base_dir, line):
+    """
+    Turns one .gitignore-style line into a rule tuple (base_dir, pattern, dir_only, anchored).
+    Supports the common subset: comments, trailing '/' for directories, leading '/'
+    or an inner '/' for anchored paths, and a leading '**/'. Negations are not supported.
+    """
+    line = line.strip()
+    if not line or line.startswith('#') or line.startswith('!'):
+        return None
+    dir_only = line.endswith('/')
+    line = line.rstrip('/')
+    if line.startswith('**/'):
+        line = line[3:]
+    anchored = '/' in line
+    return (base_dir, line.lstrip('/'), dir_only, anchored)
+
+def _read_gitignore(directory):
+    rules = []
+    try:
+        with open(os.path.join(directory, '.gitignore'), 'r', encoding='utf-8', errors='replace') as f:
+            for line in f:
+                rule = _parse_ignore_pattern(directory, line)
+                if rule:
+                    rules.append(rule)
+    except OSError as e:
+        print(f"NodeLicenseScanner: Could not read {os.path.join(directory, '.gitignore')}: {e}")
+    return rules
+
+def _is_ignored(rules, directory, name, is_dir):
+    path = os.path.join(directory, name)
+    for base_dir, pattern, dir_only, anchored in rules:
+        if dir_only and not is_dir:
+            continue
+        if anchored:
+            relative = os.path.relpath(path, base_dir).replace(os.sep, '/')
+            if fnmatch.fnmatch(relative, pattern):
+                return True
+        elif fnmatch.fnmatch(name, pattern):
+            return True
+    return False
+
+def _parse_node_source(custom_nodes_path, module_path, data):
+    """
+    Extracts the NODE_CLASS_MAPPINGS keys of a single source file, and the static input
+    schemas of its classes (see _extract_input_schemas). Returns the record fields.
+    """
+    try:
+        content = data.decode('utf-8')
+    except UnicodeDecodeError as e:
+        print(f"NodeLicenseScanner: Skipping {module_path}: not valid UTF-8 ({e})")
+        return {"nodes": {}}
+
+    fields = {"nodes": {}}
+    if INPUT_SCHEMA_MARKER.decode() in content:
+        schemas = _extract_input_schemas(content)
+        if schemas:
+            fields["schemas"] = schemas
+
+    match = NODE_MAPPING_REGEX.search(content)
+    if not match:
+        return fields
+
+    # Get the custom node package name
+    package_name = os.path.basename(os.path.dirname(module_path))
+    if package_name == os.path.basename(custom_nodes_path):
+        package_name = os.path.basename(module_path).replace('.py', '')
+
+    classes = _mapping_classes(match.group(1))
+    for name in CLASS_NAME_REGEX.findall(match.group(1)):
+        fields["nodes"][name] = {
+            "package": package_name,
+            "category": NodeLicenseScanner._categorize_custom_node(name, content),
+            "class": classes.get(name, name)
+        }
+    return fields
+
+def _mapping_classes(mapping_body):
+    """Node name -> class name from the body of a NODE_CLASS_MAPPINGS literal."""
+    return {name: value.rsplit('.', 1)[-1] for name, value in CLASS_ENTRY_REGEX.findall(mapping_body)}
+
+def _filename_list_folder(node, folder_names):
+    """The folder of a get_filename_list("<folder>") call (or a name assigned one) inside node."""
+    for child in ast.walk(node):
+        if isinstance(child, ast.Call):
+            func = child.func
+            func_name = func.attr if isinstance(func, ast.Attribute) else getattr(func, 'id', None)
+            if (func_name == 'get_filename_list' and child.args
+                    and isinstance(child.args[0], ast.Constant) and isinstance(child.args[0].value, str)):
+                return child.args[0].value
+        elif isinstance(child, ast.Name) and child.id in folder_names:
+            return folder_names[child.id]
+    return None
+
+def _assigned_folders(statements):
+    """Simple assignments of a filename list, e.g. files = folder_paths.get_filename_list("loras")."""
+    folder_names = {}
+    for statement in statements:
+        if isinstance(statement, ast.Assign) and len(statement.targets) == 1 and isinstance(statement.targets[0], ast.Name):
+            folder = _filename_list_folder(statement.value, folder_names)
+            if folder:
+                folder_names[statement.targets[0].id] = folder
+    return folder_names
+
+def _extract_input_schemas(content):
+    """
+    Statically reads the INPUT_TYPES methods of a source file, without running it.
+    Returns {class name: {input name: model folder}} for inputs whose choices come from
+    folder_paths.get_filename_list("<folder>").
+    """
+    try:
+        tree = ast.parse(content)
+    except (SyntaxError, ValueError):
+        return {}
+
+    module_folders = _assigned_folders(tree.body)
+    schemas = {}
+    for class_node in ast.walk(tree):
+        if not isinstance(class_node, ast.ClassDef):
+            continue
+        for method in class_node.body:
+            if not (isinstance(method, (ast.FunctionDef, ast.AsyncFunctionDef)) and method.name == 'INPUT_TYPES'):
+                continue
+            folder_names = {**module_folders, **_assigned_folders(method.body)}
+            schema = {}
+            for dict_node in ast.walk(method):
+                if not isinstance(dict_node, ast.Dict):
+                    continue
+                for key, value in zip(dict_node.keys, dict_node.values):
+                    # Input specs are tuples/lists whose first item holds the choices
+                    if (isinstance(key, ast.Constant) and isinstance(key.value, str)
+                            and isinstance(value, (ast.Tuple, ast.List)) and value.elts):
+                        folder = _filename_list_folder(value.elts[0], folder_names)
+                        if folder:
+                            schema[key.value] = folder
+            if schema:
+                schemas[class_node.name] = schema
+    return schemas
+
+def _is_license_file(filename):
+    return filename in LICENSE_METADATA_FILES or LICENSE_FILE_REGEX.match(filename) is not None
+
+def _license_from_classifiers(classifiers):
+    for classifier in classifiers:
+        if classifier.startswith('License ::'):
+            return classifier.split('::')[-1].strip()
+    return None
+
+def _pyproject_license(text):
+    try:
+        import tomllib
+    except ImportError:
+        # Python < 3.11: read the common inline forms only
+        match = re.search(r'^license\s*=\s*(?:\{\s*text\s*=\s*)?["\']([^"\']+)["\']', text, re.MULTILINE)
+        if match:
+            return match.group(1)
+        return _license_from_classifiers(re.findall(r'["\'](License ::[^"\']+)["\']', text))
+
+    try:
+        project = tomllib.loads(text).get('project', {})
+    except tomllib.TOMLDecodeError:
+        return None
+    license_field = project.get('license')
+    if isinstance(license_field, str) and license_field:
+        return license_field
+    if isinstance(license_field, dict) and license_field.get('text'):
+        return license_field['text']
+    # {file = "LICENSE"} points at a file that is indexed on its own
+    return _license_from_classifiers(project.get('classifiers', []))
+
+def _setup_cfg_license(text):
+    parser = configparser.ConfigParser(interpolation=None)
+    try:
+        parser.read_string(text)
+    except configparser.Error:
+        return None
+    if not parser.has_section('metadata'):
+        return None
+    license_field = parser.get('metadata', 'license', fallback='').strip()
+    if license_field:
+        return license_field
+    classifiers = parser.get('metadata', 'classifiers', fallback='').splitlines()
+    return _license_from_classifiers([c.strip() for c in classifiers])
+
+def _license_text_summary(text, filename):
+    """First line of an unrecognized license text that is not a copyright notice."""
+    for line in text.splitlines():
+        if line.strip() and not COPYRIGHT_LINE_REGEX.match(line):
+            return line.strip()
+    return f"Unrecognized license ({filename})"
+
+def _scan_license_file(license_path, previous_hash):
+    """Reads a LICENSE/COPYING file or pack metadata file and extracts its license."""
+    with open(license_path, 'rb') as f:
+        data = f.read()
+    content_hash = hashlib.sha1(data).hexdigest()
+    if content_hash == previous_hash:
+        return (content_hash, None)
+
+    text = data.decode('utf-8', errors='replace')
+    filename = os.path.basename(license_path)
+    if filename in LICENSE_METADATA_FILES:
+        license_value = _pyproject_license(text) if filename == 'pyproject.toml' else _setup_cfg_license(text)
+        return (content_hash, {"nodes": {}, "license": normalize_license_name(license_value) if license_value else None})
+
+    # Full license text: classify to an SPDX ID, falling back to its first non-copyright line
+    classifier = get_license_classifier()
+    text_hash = classifier.text_hash(text)
+    spdx_id = classifier.classify(text)
+    return (content_hash, {
+        "nodes": {},
+        "license": spdx_id or _license_text_summary(text, filename),
+        "spdx_id": spdx_id,
+        "text_hash": text_hash
+    })
+
+def _scan_package_files(custom_nodes_path, jobs):
+    """
+    Reads and parses the changed files of one package. Runs in a pool worker, so it
+    only touches its arguments. jobs is a list of (path, previous_hash); the result maps
+    path to (content_hash, fields), where fields holds the parsed record fields, or is
+    None when the content hash matches previous_hash and the old result can be kept.
+    """
+    results = {}
+    for module_path, previous_hash in jobs:
+        try:
+            if module_path.endswith('.py'):
+                results[module_path] = _scan_node_file(custom_nodes_path, module_path, previous_hash)
+            else:
+                results[module_path] = _scan_license_file(module_path, previous_hash)
+        except (OSError, ValueError) as e:
+            print(f"NodeLicenseScanner: Could not read {module_path}: {e}")
+    return results
+
+def _scan_node_file(custom_nodes_path, module_path, previous_hash):
+    """
+    Hashes a file through a memory map and only decodes and parses it when the raw bytes
+    contain NODE_CLASS_MAPPINGS or get_filename_list, which most files in a node pack do not.
+    """
+    with open(module_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            # Empty files cannot be memory-mapped
+            content_hash = hashlib.sha1(b"").hexdigest()
+            return (content_hash, None if content_hash == previous_hash else {"nodes": {}})
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            content_hash = hashlib.sha1(mm).hexdigest()
+            if content_hash == previous_hash:
+                return (content_hash, None)
+            if mm.find(NODE_MAPPING_MARKER) == -1 and mm.find(INPUT_SCHEMA_MARKER) == -1:
+                return (content_hash, {"nodes": {}})
+            return (content_hash, _parse_node_source(custom_nodes_path, module_path, mm[:]))
+
+# Essential core nodes, used when ComfyUI's nodes.py cannot be found or parsed
+FALLBACK_CORE_NODES = [
+    "KSampler", "CLIPTextEncode", "CheckpointLoaderSimple", "SaveImage",
+    "VAEDecode", "VAEEncode", "LoraLoader", "ControlNetLoader",
+    "EmptyLatentImage", "LoadImage", "PreviewImage"
+]
+
+# nodes.py path -> (mtime_ns, frozenset of class names, {class name: input schema})
+_core_node_cache = {}
+_core_node_lock = threading.Lock()
+
+def find_comfyui_nodes_file(custom_nodes_path=None):
+    """Tries multiple common ComfyUI installation paths for nodes.py."""
+    if custom_nodes_path is None:
+        custom_nodes_path = folder_paths.get_folder_paths("custom_nodes")[0]
+    possible_paths = [
+        os.path.expanduser("~/ComfyUI/nodes.py"),
+        os.path.join(os.path.dirname(custom_nodes_path), "nodes.py"),
+        os.path.join(os.path.dirname(os.path.dirname(custom_nodes_path)), "nodes.py"),
+        "/ComfyUI/nodes.py",
+        "./ComfyUI/nodes.py",
+        "../ComfyUI/nodes.py",
+        "../../ComfyUI/nodes.py"
+    ]
+    for nodes_path in possible_paths:
+        if os.path.exists(nodes_path):
+            return nodes_path
+    return None
+
+def get_core_node_index(custom_nodes_path=None):
+    """
+    Returns (nodes_path, frozenset of core node class names). nodes.py is parsed once
+    and cached by path and mtime, so deciding whether a node is native is a set lookup.
+    nodes_path is None when the fallback list is used.
+    """
+    nodes_path = find_comfyui_nodes_file(custom_nodes_path)
+    if nodes_path is None:
+        return None, frozenset(FALLBACK_CORE_NODES)
+
+    try:
+        mtime = os.stat(nodes_path).st_mtime_ns
+    except OSError:
+        return None, frozenset(FALLBACK_CORE_NODES)
+
+    cached = _core_node_cache.get(nodes_path)
+    if cached and cached[0] == mtime:
+        return nodes_path, cached[1]
+
+    with _core_node_lock:
+        print(f"NodeLicenseScanner: Found ComfyUI nodes.py at: {nodes_path}")
+        class_names = frozenset()
+        schemas = {}
+        try:
+            with open(nodes_path, "r", encoding="utf-8") as f:
+                content = f.read()
+            # Extract NODE_CLASS_MAPPINGS
+            mapping_match = NODE_MAPPING_REGEX.search(content)
+            if mapping_match:
+                class_names = frozenset(CLASS_NAME_REGEX.findall(mapping_match.group(1)))
+                class_schemas = _extract_input_schemas(content)
+                for name, class_name in _mapping_classes(mapping_match.group(1)).items():
+                    if class_name in class_schemas:
+                        schemas[name] = class_schemas[class_name]
+        except (OSError, UnicodeDecodeError) as e:
+            print(f"NodeLicenseScanner: Error reading {nodes_path}: {e}")
+
+        if not class_names:
+            print("NodeLicenseScanner: No core nodes found, using fallback list")
+            return None, frozenset(FALLBACK_CORE_NODES)
+
+        _core_node_cache[nodes_path] = (mtime, class_names, schemas)
+        return nodes_path, class_names
 
 class NodeLicenseScanner:
-    def __init__(self):
+    def __init__(self, scan_workers=None):
         self.custom_nodes_path = folder_paths.get_folder_paths("custom_nodes")[0]
         self.cache_file = os.path.join(os.path.dirname(__file__), 'node_paths.json')
         self.all_nodes_cache = os.path.join(os.path.dirname(__file__), 'all_nodes.json')
+        self.manifest_file = os.path.join(os.path.dirname(__file__), 'scan_manifest.json')
+        # Registry of all installed nodes, loaded or scanned at most once per instance
+        self._registry = None
+        self.config = self._load_config(os.path.join(os.path.dirname(__file__), 'scanner_config.json'))
+        # Worker processes used for cold scans; 1 forces a serial scan
+        self.scan_workers = scan_workers or self.config.get('scan_workers') or DEFAULT_SCAN_WORKERS
+
+    def _load_config(self, config_path):
+        """
+        Loads the optional per-install scanner_config.json:
+        {"ignore": [...], "use_default_ignores": true, "respect_gitignore": true, "scan_workers": 4}
+        """
+        if not os.path.exists(config_path):
+            return {}
+        try:
+            with open(config_path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"NodeLicenseScanner: Ignoring invalid {config_path}: {e}")
+            return {}
+
+    def _base_ignore_rules(self):
+        patterns = list(DEFAULT_IGNORE_PATTERNS) if self.config.get('use_default_ignores', True) else []
+        patterns.extend(self.config.get('ignore', []))
+        rules = [_parse_ignore_pattern(self.custom_nodes_path, p) for p in patterns]
+        return [rule for rule in rules if rule]
 
     def get_comfyui_core_nodes(self):
         """
@@ -17,63 +423,20 @@ class NodeLicenseScanner:
         print("NodeLicenseScanner: Scanning ComfyUI core nodes...")
         core_nodes = {}
 
-        # Try multiple possible ComfyUI installation paths
-        possible_paths = [
-            os.path.expanduser("~/ComfyUI/nodes.py"),
-            os.path.join(os.path.dirname(self.custom_nodes_path), "nodes.py"),
-            os.path.join(os.path.dirname(os.path.dirname(self.custom_nodes_path)), "nodes.py"),
-            "/ComfyUI/nodes.py",
-            "./ComfyUI/nodes.py",
-            "../ComfyUI/nodes.py",
-            "../../ComfyUI/nodes.py"
-        ]
-
-        for nodes_path in possible_paths:
-            if os.path.exists(nodes_path):
-                print(f"NodeLicenseScanner: Found ComfyUI nodes.py at: {nodes_path}")
-                try:
-                    with open(nodes_path, "r", encoding="utf-8") as f:
-                        content = f.read()
-
-                    # Extract NODE_CLASS_MAPPINGS
-                    mapping_match = re.search(r"NODE_CLASS_MAPPINGS\s*=\s*\{([^}]+)\}", content, re.DOTALL)
-                    if mapping_match:
-                        dict_content = mapping_match.group(1)
-                        class_names = re.findall(r"['\"]([^'\"]+)['\"]\s*:", dict_content)
-
-                        for name in class_names:
-                            core_nodes[name] = {
-                                "name": name,
-                                "file_path": nodes_path,
-                                "type": "core",
-                                "license": "ComfyUI Native (MIT License)",
-                                "category": self._categorize_core_node(name)
-                            }
-
-                        print(f"NodeLicenseScanner: Found {len(core_nodes)} core nodes")
-                        break
-
-                except Exception as e:
-                    print(f"NodeLicenseScanner: Error reading {nodes_path}: {e}")
-                    continue
-
-        # Fallback: Add essential core nodes if none found
-        if not core_nodes:
-            print("NodeLicenseScanner: No core nodes found, using fallback list")
-            fallback_nodes = [
-                "KSampler", "CLIPTextEncode", "CheckpointLoaderSimple", "SaveImage",
-                "VAEDecode", "VAEEncode", "LoraLoader", "ControlNetLoader",
-                "EmptyLatentImage", "LoadImage", "PreviewImage"
-            ]
-            for name in fallback_nodes:
-                core_nodes[name] = {
-                    "name": name,
-                    "file_path": "ComfyUI/nodes.py",
-                    "type": "core",
-                    "license": "ComfyUI Native (MIT License)",
-                    "category": self._categorize_core_node(name)
-                }
-
+        nodes_path, class_names = get_core_node_index(self.custom_nodes_path)
+        schemas = _core_node_cache[nodes_path][2] if nodes_path else {}
+        for name in sorted(class_names):
+            core_nodes[name] = {
+                "name": name,
+                "file_path": nodes_path or "ComfyUI/nodes.py",
+                "type": "core",
+                "license": "ComfyUI Native (MIT License)",
+                "category": self._categorize_core_node(name)
+            }
+            if name in schemas:
+                core_nodes[name]["model_inputs"] = schemas[name]
+
+        print(f"NodeLicenseScanner: Found {len(core_nodes)} core nodes")
         return core_nodes
 
     def _categorize_core_node(self, node_name):
@@ -93,7 +456,7 @@ class NodeLicenseScanner:
         else:
             return "utility"
 
-    def scan_all_installed_nodes(self):
+    def scan_all_installed_nodes(self, file_records=None):
         """
         Comprehensive scan of ALL installed nodes (core + custom).
         This addresses the maintainer's requirement to detect ALL installed nodes.
@@ -104,69 +467,223 @@ class NodeLicenseScanner:
         all_nodes = self.get_comfyui_core_nodes()
 
         # Get custom nodes
-        custom_nodes = self.scan_custom_nodes_enhanced()
+        custom_nodes = self.scan_custom_nodes_enhanced(file_records)
 
         # Merge them
         all_nodes.update(custom_nodes)
 
         print(f"NodeLicenseScanner: Total nodes found: {len(all_nodes)} (Core: {len([n for n in all_nodes.values() if n['type'] == 'core'])}, Custom: {len([n for n in all_nodes.values() if n['type'] == 'custom'])})")
 
-        # Cache the results
-        self._write_all_nodes_cache(all_nodes)
+        # Cache the results; node_paths.json is derived from the same registry
+        self._write_registry_caches(all_nodes)
+        self._registry = all_nodes
 
         return all_nodes
 
-    def scan_custom_nodes_enhanced(self):
+    def scan_custom_nodes_enhanced(self, file_records=None):
         """
         Enhanced custom node scanning with better categorization.
+        Only files that changed since the last scan are re-read (see _scan_custom_node_files).
         """
         print("NodeLicenseScanner: Scanning custom nodes...")
+        if file_records is None:
+            file_records, _ = self._scan_custom_node_files()
+
+        package_licenses = self.build_package_license_index(file_records)
+        package_schemas = self.build_package_schema_index(file_records)
         custom_nodes = {}
+        for module_path in sorted(file_records):
+            pack = self._pack_name(module_path)
+            pack_license = package_licenses.get(pack, {})
+            for name, node in file_records[module_path]['nodes'].items():
+                custom_nodes[name] = {
+                    "name": name,
+                    "file_path": module_path,
+                    "type": "custom",
+                    "package": node['package'],
+                    "category": node['category'],
+                    "license": pack_license.get('license', "Unknown (Custom Node)"),
+                    "license_source": pack_license.get('source')
+                }
+                schema = package_schemas.get(pack, {}).get(node.get('class', name))
+                if schema:
+                    custom_nodes[name]["model_inputs"] = schema
 
-        # Regex patterns for finding node mappings
-        mapping_regex = re.compile(r"NODE_CLASS_MAPPINGS\s*=\s*\{([^}]+)\}", re.DOTALL)
-        class_name_regex = re.compile(r"['\"]([^'\"]+)['\"]\s*:")
+        print(f"NodeLicenseScanner: Found {len(custom_nodes)} custom nodes")
+        return custom_nodes
 
-        for root, _, files in os.walk(self.custom_nodes_path):
-            # Skip our own directory
-            if os.path.abspath(root) == os.path.dirname(os.path.abspath(__file__)):
+    def build_package_license_index(self, file_records):
+        """
+        Builds pack name -> {"license", "source"} from the license files recorded during
+        the scan. Explicit pyproject.toml / setup.cfg license fields win over the text of
+        a LICENSE or COPYING file.
+        """
+        priority = {'pyproject.toml': 0, 'setup.cfg': 1}
+        candidates = {}
+        for path in sorted(file_records):
+            license_value = file_records[path].get('license')
+            if not license_value:
                 continue
+            filename = os.path.basename(path)
+            rank = priority.get(filename, 2)
+            pack = self._pack_name(path)
+            if pack not in candidates or rank < candidates[pack][0]:
+                candidates[pack] = (rank, {"license": license_value, "source": filename})
+        return {pack: entry for pack, (_, entry) in candidates.items()}
+
+    def build_package_schema_index(self, file_records):
+        """
+        Builds pack name -> {class name: {input name: model folder}} from the input schemas
+        recorded during the scan. Classes are matched within their pack, because
+        NODE_CLASS_MAPPINGS often lives in __init__.py while the classes are defined elsewhere.
+        """
+        index = {}
+        for path in sorted(file_records):
+            schemas = file_records[path].get('schemas')
+            if schemas:
+                pack_schemas = index.setdefault(self._pack_name(path), {})
+                for class_name, schema in schemas.items():
+                    pack_schemas.setdefault(class_name, schema)
+        return index
+
+    def _pack_name(self, path):
+        """Top-level directory (or single-file module) under custom_nodes that owns path."""
+        relative = os.path.relpath(path, self.custom_nodes_path)
+        return relative.split(os.sep, 1)[0]
+
+    def _scan_custom_node_files(self):
+        """
+        Incremental scan of the custom_nodes tree driven by the on-disk manifest.
 
+        Every .py file (and every license/metadata file at the root of a pack) is stat'ed,
+        but only files whose size or mtime differ from the manifest are read, and a file
+        whose content hash is unchanged keeps its previous result. Returns (file_records, fingerprint); the fingerprint identifies the set of
+        discovered nodes and is used to decide whether the JSON caches are still current.
+        """
+        manifest = self._read_manifest()
+        previous = manifest['files']
+        file_records = {}
+        pending = {}
+        own_dir = os.path.dirname(os.path.abspath(__file__))
+        respect_gitignore = self.config.get('respect_gitignore', True)
+        dir_rules = {self.custom_nodes_path: self._base_ignore_rules()}
+
+        for root, dirs, files in os.walk(self.custom_nodes_path):
+            rules = dir_rules.pop(root)
+            if respect_gitignore and '.gitignore' in files:
+                rules = rules + _read_gitignore(root)
+
+            # Prune ignored subtrees (and our own directory) before descending
+            dirs[:] = [d for d in dirs
+                       if os.path.abspath(os.path.join(root, d)) != own_dir
+                       and not _is_ignored(rules, root, d, True)]
+            for d in dirs:
+                dir_rules[os.path.join(root, d)] = rules
+
+            is_pack_root = os.path.dirname(root) == self.custom_nodes_path
             for file in files:
-                if file.endswith('.py'):
-                    module_path = os.path.join(root, file)
-                    try:
-                        with open(module_path, 'r', encoding='utf-8') as f:
-                            content = f.read()
-
-                        match = mapping_regex.search(content)
-                        if match:
-                            dict_content = match.group(1)
-                            class_names = class_name_regex.findall(dict_content)
-
-                            # Get the custom node package name
-                            package_name = os.path.basename(os.path.dirname(module_path))
-                            if package_name == os.path.basename(self.custom_nodes_path):
-                                package_name = os.path.basename(module_path).replace('.py', '')
-
-                            for name in class_names:
-                                custom_nodes[name] = {
-                                    "name": name,
-                                    "file_path": module_path,
-                                    "type": "custom",
-                                    "package": package_name,
-                                    "category": self._categorize_custom_node(name, content),
-                                    "license": "Unknown (Custom Node)"
-                                }
-
-                    except Exception as e:
-                        # Silently continue on parse errors
-                        pass
-
-        print(f"NodeLicenseScanner: Found {len(custom_nodes)} custom nodes")
-        return custom_nodes
+                if not (file.endswith('.py') or (is_pack_root and _is_license_file(file))):
+                    continue
+                if _is_ignored(rules, root, file, False):
+                    continue
+                module_path = os.path.join(root, file)
+                try:
+                    st = os.stat(module_path)
+                except OSError:
+                    continue
 
-    def _categorize_custom_node(self, node_name, content):
+                old = previous.get(module_path)
+                if old and old['size'] == st.st_size and old['mtime'] == st.st_mtime_ns:
+                    file_records[module_path] = old
+                else:
+                    pending[module_path] = st
+
+        added, modified = 0, 0
+        for module_path, (content_hash, fields) in self._parse_pending_files(pending, previous).items():
+            old = previous.get(module_path)
+            if fields is None:
+                # Touched but not modified: keep the previous result
+                fields = {k: v for k, v in old.items() if k not in ('size', 'mtime', 'hash')}
+            else:
+                if 'text_hash' in fields:
+                    # Keep classifications made in worker processes
+                    get_license_classifier().remember(fields['text_hash'], fields['spdx_id'])
+                if old:
+                    modified += 1
+                else:
+                    added += 1
+
+            st = pending[module_path]
+            file_records[module_path] = {
+                "size": st.st_size,
+                "mtime": st.st_mtime_ns,
+                "hash": content_hash,
+                **fields
+            }
+
+        get_license_classifier().save()
+
+        removed = len([path for path in previous if path not in file_records])
+        manifest_dirty = bool(pending) or bool(removed)
+
+        fingerprint = self._registry_fingerprint(file_records)
+        if manifest_dirty or manifest['fingerprint'] != fingerprint or not os.path.exists(self.manifest_file):
+            manifest['files'] = file_records
+            manifest['fingerprint'] = fingerprint
+            self._write_manifest(manifest)
+
+        print(f"NodeLicenseScanner: Incremental scan: {added} added, {modified} modified, {removed} removed, {len(file_records) - added - modified} unchanged")
+        return file_records, fingerprint
+
+    def _parse_pending_files(self, pending, previous):
+        """
+        Reads and parses the changed files, one job per top-level package. Large batches
+        go through a pool (see _scan_executor); small ones, or a pool that cannot start
+        or does not finish within SCAN_POOL_TIMEOUT, run serially.
+        Results are keyed by path, so the merge does not depend on completion order.
+        """
+        packages = {}
+        for module_path in sorted(pending):
+            old = previous.get(module_path)
+            packages.setdefault(self._pack_name(module_path), []).append((module_path, old['hash'] if old else None))
+
+        workers = min(self.scan_workers, len(packages))
+        if workers > 1 and len(pending) >= PARALLEL_MIN_FILES:
+            print(f"NodeLicenseScanner: Parsing {len(pending)} files from {len(packages)} packages with {workers} workers")
+            executor = None
+            try:
+                executor = _scan_executor(workers)
+                futures = [executor.submit(_scan_package_files, self.custom_nodes_path, jobs) for jobs in packages.values()]
+                done, not_done = wait(futures, timeout=SCAN_POOL_TIMEOUT)
+                if not_done:
+                    raise TimeoutError(f"{len(not_done)} of {len(futures)} packages unfinished after {SCAN_POOL_TIMEOUT}s")
+                results = {}
+                for future in futures:
+                    results.update(future.result())
+                return results
+            except Exception as e:
+                print(f"NodeLicenseScanner: Parallel scan failed ({e}), falling back to serial scan")
+            finally:
+                if executor is not None:
+                    # Never block on workers that may be stuck
+                    executor.shutdown(wait=False, cancel_futures=True)
+
+        results = {}
+        for jobs in packages.values():
+            results.update(_scan_package_files(self.custom_nodes_path, jobs))
+        return results
+
+    def _registry_fingerprint(self, file_records):
+        """Hash over the files that contribute nodes, input schemas or licenses; changes whenever the registry would."""
+        digest = hashlib.sha1()
+        for module_path in sorted(file_records):
+            record = file_records[module_path]
+            if record['nodes'] or record.get('schemas') or record.get('license'):
+                digest.update(f"{module_path}\0{record['hash']}\n".encode('utf-8'))
+        return digest.hexdigest()
+
+    @staticmethod
+    def _categorize_custom_node(node_name, content):
         """Categorize custom nodes based on name and content analysis"""
         name_lower = node_name.lower()
         content_lower = content.lower()
@@ -191,46 +708,14 @@ class NodeLicenseScanner:
         else:
             return "utility"
 
-    def scan_nodes_safely(self):
+    def scan_nodes_safely(self, file_records=None):
         """
         Scans all custom nodes using safe text parsing and maps them to their file paths.
-        This method does NOT execute any node code.
+        This method does NOT execute any node code. The mapping is derived from the same
+        registry as scan_all_installed_nodes, so the tree is only walked once.
         """
         print("NodeLicenseScanner: Starting safe, text-based scan of custom nodes...")
-        node_paths = {}
-        
-        # Regex to find assignments to NODE_CLASS_MAPPINGS
-        # This looks for "NODE_CLASS_MAPPINGS = {" and captures the dictionary content
-        mapping_regex = re.compile(r"NODE_CLASS_MAPPINGS\s*=\s*\{([^}]+)\}", re.DOTALL)
-        # Regex to find the class names (keys) in the mapping
-        class_name_regex = re.compile(r"['\"]([^'\"]+)['\"]\s*:")
-
-        for root, _, files in os.walk(self.custom_nodes_path):
-            # Exclude our own directory from the scan to prevent loops
-            if os.path.abspath(root) == os.path.dirname(os.path.abspath(__file__)):
-                continue
-
-            for file in files:
-                if file.endswith('.py'):
-                    module_path = os.path.join(root, file)
-                    try:
-                        with open(module_path, 'r', encoding='utf-8') as f:
-                            content = f.read()
-                        
-                        match = mapping_regex.search(content)
-                        if match:
-                            # Extract the content of the dictionary
-                            dict_content = match.group(1)
-                            # Find all class names (keys) within the dictionary
-                            class_names = class_name_regex.findall(dict_content)
-                            for name in class_names:
-                                node_paths[name] = module_path
-
-                    except Exception as e:
-                        # print(f"Could not parse {module_path}: {e}")
-                        pass
-        
-        self._write_cache(node_paths)
+        node_paths = self._node_paths_view(self.scan_all_installed_nodes(file_records))
         print(f"NodeLicenseScanner: Safe scan complete. Found {len(node_paths)} nodes.")
         return node_paths
 
@@ -238,29 +723,127 @@ class NodeLicenseScanner:
         """
         Gets ALL installed nodes (core + custom) with caching.
         This is the main method to use for comprehensive node detection.
+        The cache is only reused while no node file changed since it was written.
         """
-        if os.path.exists(self.all_nodes_cache):
+        if self._registry is not None:
+            return self._registry
+
+        file_records, fingerprint = self._scan_custom_node_files()
+        if self._is_cache_current(self.all_nodes_cache, self._registry_stamp(fingerprint)):
             print("NodeLicenseScanner: Loading all nodes from cache.")
             with open(self.all_nodes_cache, 'r') as f:
-                return json.load(f)
+                self._registry = json.load(f)
+            return self._registry
         else:
-            return self.scan_all_installed_nodes()
+            return self.scan_all_installed_nodes(file_records)
 
     def get_node_paths(self):
         """
-        Legacy method - loads node paths from cache if it exists, otherwise performs a full, safe scan.
+        Legacy method - maps custom node class names to their source files. Derived from
+        the registry returned by get_all_installed_nodes, without a separate scan.
         """
-        if os.path.exists(self.cache_file):
-            print("NodeLicenseScanner: Loading node paths from cache.")
-            with open(self.cache_file, 'r') as f:
-                return json.load(f)
-        else:
-            return self.scan_nodes_safely()
+        return self._node_paths_view(self.get_all_installed_nodes())
 
-    def _write_cache(self, data):
-        with open(self.cache_file, 'w') as f:
-            json.dump(data, f, indent=4)
+    def _node_paths_view(self, all_nodes):
+        return {name: node['file_path'] for name, node in all_nodes.items() if node['type'] == 'custom'}
 
-    def _write_all_nodes_cache(self, data):
+    def _write_registry_caches(self, all_nodes):
         with open(self.all_nodes_cache, 'w') as f:
-            json.dump(data, f, indent=4)
+            json.dump(all_nodes, f, indent=4)
+        with open(self.cache_file, 'w') as f:
+            json.dump(self._node_paths_view(all_nodes), f, indent=4)
+
+        # Record which scan the caches were written from
+        manifest = self._read_manifest()
+        manifest['caches'] = {"registry": self._registry_stamp(manifest['fingerprint'])}
+        self._write_manifest(manifest)
+
+    def _registry_stamp(self, fingerprint):
+        """Custom node fingerprint plus the identity of nodes.py the core nodes came from."""
+        nodes_path, _ = get_core_node_index(self.custom_nodes_path)
+        core_mtime = _core_node_cache.get(nodes_path, (None,))[0]
+        return f"{fingerprint}:{nodes_path}:{core_mtime}"
+
+    def _is_cache_current(self, cache_path, stamp):
+        if not os.path.exists(cache_path):
+            return False
+        return self._read_manifest()['caches'].get('registry') == stamp
+
+    def _read_manifest(self):
+        """Loads the per-file scan manifest, discarding it if it belongs to another tree."""
+        empty = {
+            "version": MANIFEST_VERSION,
+            "root": self.custom_nodes_path,
+            "fingerprint": None,
+            "caches": {},
+            "files": {}
+        }
+        try:
+            with open(self.manifest_file, 'r') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return empty
+        if manifest.get('version') != MANIFEST_VERSION or manifest.get('root') != self.custom_nodes_path:
+            return empty
+        return manifest
+
+    def _write_manifest(self, manifest):
+        with open(self.manifest_file, 'w') as f:
+            json.dump(manifest, f)
+
+
+class NodeRegistry:
+    """
+    Process-lifetime registry of installed nodes, shared by every WorkflowSummary
+    execution. The first lookup loads (or incrementally rescans) through
+    NodeLicenseScanner; later lookups are plain dict accesses until invalidate()
+    or reload() is called.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._nodes = None
+        self._node_paths = None
+
+    def _ensure_loaded(self):
+        """
+        Returns a (nodes, node_paths) snapshot taken under the lock, so a concurrent
+        invalidate() cannot leave a caller holding one half of it, or None.
+        """
+        with self._lock:
+            if self._nodes is None:
+                scanner = NodeLicenseScanner()
+                self._nodes = scanner.get_all_installed_nodes()
+                self._node_paths = scanner.get_node_paths()
+            return self._nodes, self._node_paths
+
+    def all_nodes(self):
+        """All installed nodes (core + custom), keyed by class name."""
+        return self._ensure_loaded()[0]
+
+    def node_paths(self):
+        """Custom node class name -> source file, as in the legacy node_paths.json."""
+        return self._ensure_loaded()[1]
+
+    def get(self, node_type):
+        return self._ensure_loaded()[0].get(node_type)
+
+    def get_node_path(self, node_type):
+        return self._ensure_loaded()[1].get(node_type)
+
+    def invalidate(self):
+        """Drops the in-memory registry; the next lookup rescans changed files."""
+        with self._lock:
+            self._nodes = None
+            self._node_paths = None
+
+    def reload(self):
+        """Invalidates and immediately reloads the registry."""
+        self.invalidate()
+        return self._ensure_loaded()[0]
+
+
+_node_registry = NodeRegistry()
+
+def get_node_registry():
+    """Returns the registry shared by all executions in this process."""
+    return _node_registry
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Behaviour tests for the manifest-based incremental custom_nodes scan. Each test builds
+a small custom_nodes tree in a temporary directory and keeps the scan caches there.
+
+    python test_incremental_scan.py
+"""
+
+import os
+import sys
+import tempfile
+import textwrap
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from test_support import import_node_module, run_tests
+
+scanner_module = import_node_module("scanner")
+license_classifier = import_node_module("license_classifier")
+
+MIT_TEXT = """MIT License
+
+Copyright (c) 2024 Example Author
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+def node_source(*class_names):
+    classes = "".join(f"class {name}:\n    CATEGORY = 'example'\n\n" for name in class_names)
+    mapping = ", ".join(f'"{name}": {name}' for name in class_names)
+    return f"{classes}NODE_CLASS_MAPPINGS = {{{mapping}}}\n"
+
+
+def write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        f.write(textwrap.dedent(text))
+
+
+class ScanFixture:
+    """A custom_nodes tree plus a scanner whose caches live next to it, not in the node directory."""
+    def __init__(self, tmp, scan_workers=1):
+        self.custom_nodes = os.path.join(tmp, "custom_nodes")
+        os.makedirs(self.custom_nodes, exist_ok=True)
+        cache_dir = os.path.join(tmp, "cache")
+        os.makedirs(cache_dir, exist_ok=True)
+        license_classifier._classifier = license_classifier.LicenseClassifier(
+            cache_path=os.path.join(cache_dir, "license_classifications.json"))
+
+        self.cache_dir = cache_dir
+        self.scan_workers = scan_workers
+        self.parsed = []
+
+    def path(self, *parts):
+        return os.path.join(self.custom_nodes, *parts)
+
+    def scanner(self):
+        """A fresh scanner, as a new ComfyUI process would create; records the files it parses."""
+        scanner = scanner_module.NodeLicenseScanner(scan_workers=self.scan_workers)
+        scanner.custom_nodes_path = self.custom_nodes
+        scanner.config = {}
+        scanner.cache_file = os.path.join(self.cache_dir, "node_paths.json")
+        scanner.all_nodes_cache = os.path.join(self.cache_dir, "all_nodes.json")
+        scanner.manifest_file = os.path.join(self.cache_dir, "scan_manifest.json")
+
+        parse = scanner._parse_pending_files
+        def recording_parse(pending, previous):
+            self.parsed.append(sorted(os.path.relpath(p, self.custom_nodes) for p in pending))
+            return parse(pending, previous)
+        scanner._parse_pending_files = recording_parse
+        return scanner
+
+    def scan(self):
+        return self.scanner().get_all_installed_nodes()
+
+
+def custom(nodes):
+    return {name: node for name, node in nodes.items() if node['type'] == 'custom'}
+
+
+def test_cold_scan_reads_packs_and_licenses():
+    with tempfile.TemporaryDirectory() as tmp:
+        fx = ScanFixture(tmp)
+        write(fx.path("PackA", "nodes.py"), node_source("NodeA1", "NodeA2"))
+        write(fx.path("PackA", "LICENSE"), MIT_TEXT)
+        write(fx.path("PackB", "__init__.py"), node_source("NodeB"))
+        write(fx.path("PackB", "utils.py"), "def helper():\n    return 1\n")
+
+        nodes = custom(fx.scan())
+        assert set(nodes) == {"NodeA1", "NodeA2", "NodeB"}
+        assert nodes["NodeA1"]["package"] == "PackA"
+        assert nodes["NodeA1"]["license"] == "MIT"
+        assert nodes["NodeB"]["license"] == "Unknown (Custom Node)"
+        assert fx.parsed == [["PackA/LICENSE", "PackA/nodes.py", "PackB/__init__.py", "PackB/utils.py"]]
+
+
+def test_unchanged_tree_reads_nothing():
+    with tempfile.TemporaryDirectory() as tmp:
+        fx = ScanFixture(tmp)
+        write(fx.path("PackA", "nodes.py"), node_source("NodeA"))
+        first = fx.scan()
+        second = fx.scan()
+        assert fx.parsed[1] == []
+        assert second == first
+
+
+def test_changed_file_is_the_only_one_reparsed():
+    with tempfile.TemporaryDirectory() as tmp:
+        fx = ScanFixture(tmp)
+        write(fx.path("PackA", "nodes.py"), node_source("NodeA"))
+        write(fx.path("PackB", "nodes.py"), node_source("NodeB"))
+        fx.scan()
+
+        write(fx.path("PackB", "nodes.py"), node_source("NodeB", "NodeB2"))
+        nodes = custom(fx.scan())
+        assert fx.parsed[1] == ["PackB/nodes.py"]
+        assert set(nodes) == {"NodeA", "NodeB", "NodeB2"}
+
+
+def test_touched_file_keeps_its_nodes():
+    with tempfile.TemporaryDirectory() as tmp:
+        fx = ScanFixture(tmp)
+        path = fx.path("PackA", "nodes.py")
+        write(path, node_source("NodeA"))
+        fx.scan()
+
+        st = os.stat(path)
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+        nodes = custom(fx.scan())
+        assert fx.parsed[1] == ["PackA/nodes.py"]
+        assert set(nodes) == {"NodeA"}
+
+
+def test_added_and_removed_files():
+    with tempfile.TemporaryDirectory() as tmp:
+        fx = ScanFixture(tmp)
+        write(fx.path("PackA", "nodes.py"), node_source("NodeA"))
+        write(fx.path("PackB", "nodes.py"), node_source("NodeB"))
+        fx.scan()
+
+        os.remove(fx.path("PackB", "nodes.py"))
+        write(fx.path("PackC", "nodes.py"), node_source("NodeC"))
+        nodes = custom(fx.scan())
+        assert fx.parsed[1] == ["PackC/nodes.py"]
+        assert set(nodes) == {"NodeA", "NodeC"}
+
+
+def test_parallel_scan_matches_serial_scan():
+    with tempfile.TemporaryDirectory() as tmp:
+        serial, parallel = ScanFixture(os.path.join(tmp, "s")), ScanFixture(os.path.join(tmp, "p"), scan_workers=4)
+        for fx in (serial, parallel):
+            for pack in range(4):
+                for i in range(5):
+                    write(fx.path(f"Pack{pack}", f"nodes_{i}.py"), node_source(f"Node{pack}_{i}"))
+
+        previous = scanner_module.PARALLEL_MIN_FILES
+        scanner_module.PARALLEL_MIN_FILES = 1
+        try:
+            parallel_nodes = custom(parallel.scan())
+        finally:
+            scanner_module.PARALLEL_MIN_FILES = previous
+        serial_nodes = custom(serial.scan())
+
+        assert len(serial_nodes) == 20
+        assert {name: node['package'] for name, node in parallel_nodes.items()} == \
+               {name: node['package'] for name, node in serial_nodes.items()}
+
+
+if __name__ == "__main__":
+    sys.exit(run_tests(dict(globals())))
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Behaviour tests for the node pack license classifier and the summaries reported for
+license texts it does not recognize.
+
+    python test_license_classifier.py
+"""
+
+import os
+import sys
+import json
+import shutil
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from test_support import import_node_module, run_tests
+
+license_classifier = import_node_module("license_classifier")
+scanner = import_node_module("scanner")
+
+
+def reference_text(spdx_id):
+    with open(os.path.join(license_classifier.REFERENCE_DIR, f"{spdx_id}.txt"), 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def new_classifier(tmp):
+    return license_classifier.LicenseClassifier(cache_path=os.path.join(tmp, "license_classifications.json"))
+
+
+def test_reference_texts_classify_to_their_ids():
+    with tempfile.TemporaryDirectory() as tmp:
+        classifier = new_classifier(tmp)
+        for filename in sorted(os.listdir(license_classifier.REFERENCE_DIR)):
+            spdx_id = filename[:-len('.txt')]
+            assert classifier.classify(reference_text(spdx_id)) == spdx_id, spdx_id
+
+
+def test_copies_with_other_holders_and_wrapping_match():
+    with tempfile.TemporaryDirectory() as tmp:
+        classifier = new_classifier(tmp)
+        text = reference_text("MIT").replace("\n", " ")
+        text = "Copyright (c) 2019-2024 Someone Else <someone@example.com>\n\n" + text.upper()
+        assert classifier.classify(text) == "MIT"
+
+        # BSD-3-Clause contains all of BSD-2-Clause; the longer match wins
+        assert classifier.classify(reference_text("BSD-3-Clause")) == "BSD-3-Clause"
+        assert classifier.classify(reference_text("BSD-2-Clause")) == "BSD-2-Clause"
+
+
+def test_unrelated_and_partial_texts_are_not_classified():
+    with tempfile.TemporaryDirectory() as tmp:
+        classifier = new_classifier(tmp)
+        assert classifier.classify("All rights reserved. Do not redistribute.") is None
+        first_paragraph = reference_text("Apache-2.0")[:400]
+        assert classifier.classify(first_paragraph) is None
+
+
+def test_classifications_are_cached_on_disk():
+    with tempfile.TemporaryDirectory() as tmp:
+        classifier = new_classifier(tmp)
+        text = reference_text("ISC")
+        assert classifier.classify(text) == "ISC"
+        classifier.save()
+
+        with open(classifier.cache_path, 'r') as f:
+            cache = json.load(f)
+        assert cache["entries"] == {classifier.text_hash(text): "ISC"}
+
+        reloaded = new_classifier(tmp)
+        reloaded._ensure_loaded()
+        reloaded._classify_uncached = lambda text: "not used"
+        assert reloaded.classify(text) == "ISC"
+
+
+def test_cache_is_dropped_when_the_references_change():
+    with tempfile.TemporaryDirectory() as tmp:
+        reference_dir = os.path.join(tmp, "licenses")
+        shutil.copytree(license_classifier.REFERENCE_DIR, reference_dir)
+        cache_path = os.path.join(tmp, "license_classifications.json")
+        classifier = license_classifier.LicenseClassifier(reference_dir, cache_path)
+        assert classifier.classify(reference_text("MIT")) == "MIT"
+        classifier.save()
+
+        os.remove(os.path.join(reference_dir, "MIT.txt"))
+        changed = license_classifier.LicenseClassifier(reference_dir, cache_path)
+        assert changed.classify(reference_text("MIT")) is None
+
+
+def test_license_names_are_normalized():
+    assert license_classifier.normalize_license_name(" MIT License ") == "MIT"
+    assert license_classifier.normalize_license_name("Apache Software License") == "Apache-2.0"
+    assert license_classifier.normalize_license_name("Proprietary") == "Proprietary"
+
+
+def test_unrecognized_license_summary_skips_copyright_lines():
+    text = "Copyright (c) 2023 Example\n(C) Other Holder\n\nExample Community License v2\n\nTerms..."
+    assert scanner._license_text_summary(text, "LICENSE") == "Example Community License v2"
+    assert scanner._license_text_summary("© 2023 Example\n\n", "COPYING") == "Unrecognized license (COPYING)"
+
+
+if __name__ == "__main__":
+    sys.exit(run_tests(dict(globals())))
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Behaviour tests for the license resolver chain, run against the local HuggingFace and
+CivitAI stand-in server (license_standin_server.py); no network access is needed.
+
+    python test_license_resolver.py
+"""
+
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from test_support import import_node_module, run_tests
+from license_standin_server import start_standin_server
+
+resolver = import_node_module("license_resolver")
+UNKNOWN_LICENSE = import_node_module("model_license_cache").UNKNOWN_LICENSE
+
+MODEL_SHA256 = "ab" * 32
+FIXTURES = {
+    "huggingface": {"realvisxl": "openrail++"},
+    "civitai": {"DreamShaper": "CreativeML Open RAIL-M"},
+    "civitai_hashes": {MODEL_SHA256: "DreamShaper"},
+}
+
+
+@contextmanager
+def standin_chain(mode, fixtures=FIXTURES, latency=0.0):
+    """A HuggingFace-then-CivitAI chain whose providers talk to a fresh stand-in server."""
+    server = start_standin_server(fixtures, latency)
+    try:
+        yield resolver.LicenseResolverChain([
+            resolver.HuggingFaceProvider(base_url=server.base_url),
+            resolver.CivitAIProvider(base_url=server.base_url),
+        ], mode=mode)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_sequential_chain():
+    with standin_chain("sequential") as chain:
+        assert chain.resolve("realvisxl.safetensors") == ("HuggingFace: openrail++", "huggingface")
+        assert chain.resolve("loras/DreamShaper.safetensors") == ("CivitAI: CreativeML Open RAIL-M", "civitai")
+        assert chain.resolve("nowhere_to_be_found.ckpt") == (UNKNOWN_LICENSE, "none")
+
+
+def test_race_chain():
+    with standin_chain("race") as chain:
+        assert chain.resolve("realvisxl.safetensors") == ("HuggingFace: openrail++", "huggingface")
+        assert chain.resolve("DreamShaper.safetensors") == ("CivitAI: CreativeML Open RAIL-M", "civitai")
+        assert chain.resolve("nowhere_to_be_found.ckpt") == (UNKNOWN_LICENSE, "none")
+
+
+def test_hash_lookup_is_marked_by_source():
+    for mode in ("sequential", "race"):
+        with standin_chain(mode) as chain:
+            license_val, source = chain.resolve("renamed_copy.safetensors", sha256=MODEL_SHA256)
+            assert license_val == "CivitAI: CreativeML Open RAIL-M"
+            assert source == "civitai" + resolver.HASH_SOURCE_SUFFIX
+            # A name-only answer never carries the suffix
+            assert chain.resolve("DreamShaper.safetensors")[1] == "civitai"
+
+
+def test_budget_exhaustion_returns_pending():
+    for mode in ("sequential", "race"):
+        with standin_chain(mode, latency=1.0) as chain:
+            start = time.monotonic()
+            result = chain.resolve("DreamShaper.safetensors", deadline=start + 0.3)
+            elapsed = time.monotonic() - start
+            assert result == (resolver.LICENSE_PENDING, "timeout"), (mode, result)
+            assert elapsed < 1.0, f"{mode} mode ran {elapsed:.2f}s past a 0.3s budget"
+
+
+def test_expired_budget_makes_no_request():
+    with standin_chain("sequential") as chain:
+        assert chain.resolve("realvisxl.safetensors", deadline=time.monotonic() - 1) == (resolver.LICENSE_PENDING, "timeout")
+
+
+def test_non_json_response_is_a_miss():
+    fixtures = dict(FIXTURES, non_json=["huggingface"])
+    for mode in ("sequential", "race"):
+        with standin_chain(mode, fixtures) as chain:
+            # HuggingFace answers 200 with HTML; CivitAI is still asked
+            assert chain.resolve("DreamShaper.safetensors") == ("CivitAI: CreativeML Open RAIL-M", "civitai")
+            assert chain.resolve("realvisxl.safetensors") == (UNKNOWN_LICENSE, "none")
+
+    fixtures = dict(FIXTURES, non_json=["huggingface", "civitai"])
+    with standin_chain("sequential", fixtures) as chain:
+        assert chain.resolve("DreamShaper.safetensors", sha256=MODEL_SHA256) == (UNKNOWN_LICENSE, "none")
+
+
+def test_failing_provider_is_skipped():
+    class BrokenProvider(resolver.LicenseProvider):
+        name = "broken"
+
+        def lookup(self, model_name, deadline=None):
+            raise RuntimeError("provider bug")
+
+    server = start_standin_server(FIXTURES)
+    try:
+        for mode in ("sequential", "race"):
+            chain = resolver.LicenseResolverChain(
+                [BrokenProvider(), resolver.CivitAIProvider(base_url=server.base_url)], mode=mode)
+            assert chain.resolve("DreamShaper.safetensors") == ("CivitAI: CreativeML Open RAIL-M", "civitai")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    sys.exit(run_tests(dict(globals())))
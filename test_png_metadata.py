@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Behaviour tests for the PNG text chunk reader and the per-image prompt digest cache.
+
+    python test_png_metadata.py
+"""
+
+import os
+import sys
+import json
+import zlib
+import struct
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from test_support import import_node_module, run_tests
+
+png_metadata = import_node_module("png_metadata")
+
+PROMPT = {"3": {"class_type": "KSampler", "inputs": {"seed": 1, "positive": ["6", 0]}},
+          "6": {"class_type": "CLIPTextEncode", "inputs": {"text": "a cat ✓"}}}
+
+
+def chunk(chunk_type, data, crc=None):
+    if crc is None:
+        crc = zlib.crc32(chunk_type + data)
+    return struct.pack('>I', len(data)) + chunk_type + data + struct.pack('>I', crc)
+
+
+def text_chunk(keyword, text):
+    return chunk(b'tEXt', keyword.encode('latin-1') + b'\0' + text.encode('latin-1'))
+
+
+def ztxt_chunk(keyword, text):
+    return chunk(b'zTXt', keyword.encode('latin-1') + b'\0\0' + zlib.compress(text.encode('latin-1')))
+
+
+def itxt_chunk(keyword, text, compressed=False):
+    data = text.encode('utf-8')
+    if compressed:
+        data = zlib.compress(data)
+    header = keyword.encode('latin-1') + b'\0' + (b'\x01' if compressed else b'\x00') + b'\0' + b'en\0' + b'\0'
+    return chunk(b'iTXt', header + data)
+
+
+def png_bytes(before_idat=(), after_idat=()):
+    """A 1x1 grey PNG with the given extra chunks around its image data."""
+    ihdr = chunk(b'IHDR', struct.pack('>IIBBBBB', 1, 1, 8, 0, 0, 0, 0))
+    idat = chunk(b'IDAT', zlib.compress(b'\0\x80'))
+    return (png_metadata.PNG_SIGNATURE + ihdr + b''.join(before_idat) + idat
+            + b''.join(after_idat) + chunk(b'IEND', b''))
+
+
+def write(directory, name, data):
+    path = os.path.join(directory, name)
+    with open(path, 'wb') as f:
+        f.write(data)
+    return path
+
+
+def test_reads_all_text_chunk_types():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write(tmp, "a.png", png_bytes([
+            text_chunk("plain", "latin text é"),
+            ztxt_chunk("zipped", "compressed text"),
+            itxt_chunk("intl", "unicode ✓ text"),
+            itxt_chunk("intl_z", "compressed unicode ✓", compressed=True),
+        ]))
+        assert png_metadata.read_png_text(path) == {
+            "plain": "latin text é",
+            "zipped": "compressed text",
+            "intl": "unicode ✓ text",
+            "intl_z": "compressed unicode ✓",
+        }
+
+
+def test_keyword_filter_and_first_chunk_wins():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write(tmp, "a.png", png_bytes([
+            text_chunk("workflow", "{}"), text_chunk("prompt", "first"), text_chunk("prompt", "second"),
+        ]))
+        assert png_metadata.read_png_text(path, keywords=("prompt",)) == {"prompt": "first"}
+
+
+def test_stops_at_image_data():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write(tmp, "a.png", png_bytes([text_chunk("before", "yes")], [text_chunk("after", "no")]))
+        assert png_metadata.read_png_text(path) == {"before": "yes"}
+
+
+def test_damaged_chunks_are_skipped():
+    with tempfile.TemporaryDirectory() as tmp:
+        bad_crc = chunk(b'tEXt', b'broken\0text', crc=0)
+        bad_zlib = chunk(b'zTXt', b'zipped\0\0not zlib data')
+        path = write(tmp, "a.png", png_bytes([bad_crc, bad_zlib, text_chunk("good", "kept")]))
+        assert png_metadata.read_png_text(path) == {"good": "kept"}
+
+        # Cut off in the middle of a text chunk
+        data = png_bytes([text_chunk("good", "kept"), text_chunk("prompt", "x" * 100)])
+        truncated = write(tmp, "truncated.png", data[:data.index(b'prompt') + 20])
+        assert png_metadata.read_png_text(truncated) == {"good": "kept"}
+
+
+def test_non_png_files():
+    with tempfile.TemporaryDirectory() as tmp:
+        assert png_metadata.read_png_text(write(tmp, "a.jpg", b'\xff\xd8\xff\xe0 not a png')) is None
+        assert png_metadata.read_png_text(write(tmp, "empty.png", b'')) is None
+
+
+def test_prompt_digest_ignores_key_order_and_formatting():
+    reordered = json.loads(json.dumps(PROMPT, indent=2, sort_keys=True))
+    reordered = {key: reordered[key] for key in reversed(list(reordered))}
+    assert png_metadata.prompt_digest(reordered) == png_metadata.prompt_digest(PROMPT)
+    changed = json.loads(json.dumps(PROMPT))
+    changed["3"]["inputs"]["seed"] = 2
+    assert png_metadata.prompt_digest(changed) != png_metadata.prompt_digest(PROMPT)
+
+
+def test_prompt_cache_follows_file_versions():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = png_metadata.PngPromptCache()
+        path = write(tmp, "ComfyUI_00001_.png", png_bytes([itxt_chunk("prompt", json.dumps(PROMPT))]))
+        assert cache.digest(path) == png_metadata.prompt_digest(PROMPT)
+
+        # Same size and mtime: answered from the cache without reading the file
+        st = os.stat(path)
+        with open(path, 'r+b') as f:
+            f.write(b'\0' * 8)
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns))
+        assert cache.digest(path) == png_metadata.prompt_digest(PROMPT)
+
+        # A new version of the file is read again
+        other = {"1": {"class_type": "SaveImage", "inputs": {}}}
+        write(tmp, "ComfyUI_00001_.png", png_bytes([text_chunk("prompt", json.dumps(other))]))
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+        assert cache.digest(path) == png_metadata.prompt_digest(other)
+
+
+def test_prompt_cache_without_prompt():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = png_metadata.PngPromptCache()
+        assert cache.digest(write(tmp, "plain.png", png_bytes())) is None
+        assert cache.digest(write(tmp, "bad.png", png_bytes([text_chunk("prompt", "{not json")]))) is None
+        assert cache.digest(write(tmp, "photo.jpg", b'\xff\xd8\xff')) is None
+        assert cache.digest(os.path.join(tmp, "missing.png")) is None
+
+
+if __name__ == "__main__":
+    sys.exit(run_tests(dict(globals())))
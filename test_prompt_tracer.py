@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Behaviour tests for prompt attribution on API-format prompts (WorkflowGraph and
+PromptTracer).
+
+    python test_prompt_tracer.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from test_support import import_node_module, run_tests
+
+WorkflowGraph = import_node_module("workflow_graph").WorkflowGraph
+PromptTracer = import_node_module("prompt_tracer").PromptTracer
+
+
+def node(class_type, **inputs):
+    return {"class_type": class_type, "inputs": inputs}
+
+
+def base_prompt():
+    """Checkpoint, two text encoders and the decode/save tail of the default workflow."""
+    return {
+        "4": node("CheckpointLoaderSimple", ckpt_name="sd_xl_base_1.0.safetensors"),
+        "6": node("CLIPTextEncode", text="a cat on a windowsill", clip=["4", 1]),
+        "7": node("CLIPTextEncode", text="blurry, lowres", clip=["4", 1]),
+        "8": node("VAEDecode", samples=["3", 0], vae=["4", 2]),
+        "9": node("SaveImage", images=["8", 0], filename_prefix="ComfyUI"),
+    }
+
+
+def prompts_for(prompt, node_id):
+    return PromptTracer(WorkflowGraph(prompt)).prompts_for(node_id)
+
+
+def test_ksampler_prompts():
+    prompt = base_prompt()
+    prompt["3"] = node("KSampler", model=["4", 0], positive=["6", 0], negative=["7", 0], seed=1)
+    assert prompts_for(prompt, "9") == {"positive": "a cat on a windowsill", "negative": "blurry, lowres"}
+
+
+def test_conditioning_passes_through_controlnet_by_output_index():
+    prompt = base_prompt()
+    prompt["10"] = node("ControlNetApplyAdvanced", positive=["6", 0], negative=["7", 0], strength=1.0)
+    # Wired crosswise on purpose: output 1 (negative) into the positive input
+    prompt["3"] = node("KSampler", model=["4", 0], positive=["10", 1], negative=["10", 0])
+    assert prompts_for(prompt, "9") == {"positive": "blurry, lowres", "negative": "a cat on a windowsill"}
+
+
+def test_sampler_custom_advanced_with_guiders():
+    prompt = base_prompt()
+    prompt["20"] = node("CFGGuider", model=["4", 0], positive=["6", 0], negative=["7", 0], cfg=7.0)
+    prompt["3"] = node("SamplerCustomAdvanced", guider=["20", 0], noise=["21", 0])
+    prompt["21"] = node("RandomNoise", noise_seed=1)
+    assert prompts_for(prompt, "9") == {"positive": "a cat on a windowsill", "negative": "blurry, lowres"}
+
+    prompt["20"] = node("BasicGuider", model=["4", 0], conditioning=["6", 0])
+    assert prompts_for(prompt, "9") == {"positive": "a cat on a windowsill"}
+
+
+def test_text_from_primitive_and_sdxl_encoders():
+    prompt = base_prompt()
+    prompt["30"] = node("PrimitiveString", value="from a primitive")
+    prompt["6"] = node("CLIPTextEncode", text=["30", 0], clip=["4", 1])
+    prompt["7"] = node("CLIPTextEncodeSDXL", text_g="sdxl negative", text_l="", clip=["4", 1])
+    prompt["3"] = node("KSampler", model=["4", 0], positive=["6", 0], negative=["7", 0])
+    assert prompts_for(prompt, "9") == {"positive": "from a primitive", "negative": "sdxl negative"}
+
+
+def test_each_output_gets_its_own_sampler():
+    prompt = base_prompt()
+    prompt["3"] = node("KSampler", model=["4", 0], positive=["6", 0], negative=["7", 0])
+    prompt["11"] = node("CLIPTextEncode", text="a dog", clip=["4", 1])
+    prompt["12"] = node("KSampler", model=["4", 0], positive=["11", 0], negative=["7", 0], latent_image=["3", 0])
+    prompt["13"] = node("VAEDecode", samples=["12", 0], vae=["4", 2])
+    prompt["14"] = node("SaveImage", images=["13", 0], filename_prefix="refined")
+
+    tracer = PromptTracer(WorkflowGraph(prompt))
+    assert tracer.prompts_for("9")["positive"] == "a cat on a windowsill"
+    # The nearest sampler wins, not the first one upstream of it
+    assert tracer.prompts_for("14")["positive"] == "a dog"
+
+
+def test_output_without_sampler_has_no_prompts():
+    prompt = {
+        "1": node("LoadImage", image="input.png"),
+        "2": node("SaveImage", images=["1", 0], filename_prefix="copy"),
+    }
+    assert prompts_for(prompt, "2") == {}
+
+
+def test_deep_and_cyclic_graphs():
+    prompt = base_prompt()
+    prompt["3"] = node("KSampler", model=["4", 0], positive=["6", 0], negative=["7", 0])
+    # A long chain of image nodes between the decode and the save
+    previous = "8"
+    for i in range(100, 5100):
+        prompt[str(i)] = node("ImageScale", image=[previous, 0])
+        previous = str(i)
+    prompt["9"] = node("SaveImage", images=[previous, 0], filename_prefix="deep")
+    assert prompts_for(prompt, "9")["positive"] == "a cat on a windowsill"
+
+    # Broken prompts may contain cycles; tracing must still terminate
+    cyclic = {
+        "1": node("Reroute", input=["2", 0]),
+        "2": node("Reroute", input=["1", 0]),
+        "3": node("SaveImage", images=["1", 0]),
+    }
+    assert prompts_for(cyclic, "3") == {}
+
+
+def test_dangling_links_and_non_node_entries_are_ignored():
+    prompt = base_prompt()
+    prompt["3"] = node("KSampler", model=["4", 0], positive=["6", 0], negative=["99", 0])
+    prompt["extra"] = "not a node"
+    assert prompts_for(prompt, "9") == {"positive": "a cat on a windowsill", "negative": None}
+
+
+if __name__ == "__main__":
+    sys.exit(run_tests(dict(globals())))
@@ -0,0 +1,46 @@
+"""
+Helpers for the behaviour tests (test_*.py) that run outside of ComfyUI.
+
+The node's modules use package-relative imports, so they are imported as
+submodules of this directory registered under PACKAGE_NAME. The package's
+__init__ (which loads the PDF node and its dependencies) is not run. When
+ComfyUI's folder_paths is not importable, mock_folder_paths stands in for it.
+"""
+
+import os
+import sys
+import types
+import importlib
+
+NODE_DIR = os.path.dirname(os.path.abspath(__file__))
+PACKAGE_NAME = "workflow_summary_node"
+
+
+def import_node_module(name):
+    """Imports one of the node's modules, e.g. import_node_module("scanner")."""
+    if "folder_paths" not in sys.modules:
+        try:
+            import folder_paths  # noqa: F401
+        except ImportError:
+            sys.path.insert(0, NODE_DIR)
+            sys.modules["folder_paths"] = importlib.import_module("mock_folder_paths")
+    if PACKAGE_NAME not in sys.modules:
+        package = types.ModuleType(PACKAGE_NAME)
+        package.__path__ = [NODE_DIR]
+        sys.modules[PACKAGE_NAME] = package
+    return importlib.import_module(f"{PACKAGE_NAME}.{name}")
+
+
+def run_tests(namespace):
+    """Runs the test_* functions of a module when it is executed as a script."""
+    tests = [(name, func) for name, func in namespace.items() if name.startswith("test_") and callable(func)]
+    failed = 0
+    for name, func in tests:
+        try:
+            func()
+            print(f"✅ {name}")
+        except Exception as e:
+            failed += 1
+            print(f"❌ {name}: {type(e).__name__}: {e}")
+    print(f"\nOverall: {len(tests) - failed}/{len(tests)} tests passed")
+    return 1 if failed else 0
@@ -0,0 +1,111 @@
+from collections import deque
+
+
+def _is_link(value):
+    """API-format inputs reference other nodes as [source_node_id, output_index]."""
+    return (isinstance(value, (list, tuple)) and len(value) == 2
+            and isinstance(value[0], (str, int)) and isinstance(value[1], int))
+
+
+class WorkflowGraph:
+    """
+    Index over an executed (API-format) prompt, built once per export.
+
+    Link inputs (["4", 0]) become edges: reverse adjacency per node and input name,
+    and forward adjacency per source node. Literal inputs are kept apart, so widget
+    values can be read without skipping links. Traversals are iterative, so deep or
+    cyclic graphs cannot exhaust the recursion limit.
+    """
+    def __init__(self, prompt):
+        self.nodes = {}
+        self.class_types = {}
+        self.links = {}
+        self.literals = {}
+        self.forward = {}
+        self.by_class = {}
+
+        for node_id, node_info in prompt.items():
+            if not isinstance(node_info, dict) or 'class_type' not in node_info:
+                continue
+            node_id = str(node_id)
+            self.nodes[node_id] = node_info
+            self.class_types[node_id] = node_info['class_type']
+            self.by_class.setdefault(node_info['class_type'], []).append(node_id)
+
+            links, literals = {}, {}
+            for input_name, value in (node_info.get('inputs') or {}).items():
+                if _is_link(value):
+                    links[input_name] = (str(value[0]), value[1])
+                else:
+                    literals[input_name] = value
+            self.links[node_id] = links
+            self.literals[node_id] = literals
+
+        for node_id, links in self.links.items():
+            for input_name, (source_id, output_index) in links.items():
+                if source_id in self.nodes:
+                    self.forward.setdefault(source_id, []).append((node_id, input_name, output_index))
+
+    def class_type(self, node_id):
+        return self.class_types.get(str(node_id))
+
+    def source(self, node_id, input_name):
+        """(source node id, output index) feeding a node's input, or None."""
+        link = self.links.get(str(node_id), {}).get(input_name)
+        return link if link and link[0] in self.nodes else None
+
+    def literal(self, node_id, input_name, default=None):
+        return self.literals.get(str(node_id), {}).get(input_name, default)
+
+    def nodes_of_class(self, *class_types):
+        return [node_id for class_type in class_types for node_id in self.by_class.get(class_type, [])]
+
+    def parents(self, node_id):
+        """Source node ids of a node's link inputs, in input order."""
+        return [source_id for source_id, _ in self.links.get(str(node_id), {}).values() if source_id in self.nodes]
+
+    def ancestors(self, node_id):
+        """Every node upstream of node_id, nearest first (breadth-first)."""
+        return list(self._walk(str(node_id), self.parents))
+
+    def descendants(self, node_id):
+        """Every node downstream of node_id, nearest first (breadth-first)."""
+        return list(self._walk(str(node_id), lambda n: [dest for dest, _, _ in self.forward.get(n, [])]))
+
+    def find_ancestor(self, node_id, predicate, include_self=False):
+        """Nearest upstream node (breadth-first) for which predicate(node_id) is true, or None."""
+        node_id = str(node_id)
+        if include_self and predicate(node_id):
+            return node_id
+        for ancestor in self._walk(node_id, self.parents):
+            if predicate(ancestor):
+                return ancestor
+        return None
+
+    def _walk(self, start, neighbours):
+        seen = {start}
+        queue = deque(neighbours(start))
+        while queue:
+            node_id = queue.popleft()
+            if node_id in seen:
+                continue
+            seen.add(node_id)
+            yield node_id
+            queue.extend(neighbours(node_id))
+
+    def topological_order(self):
+        """Node ids with every source before its consumers; nodes on cycles come last."""
+        indegree = {node_id: len(self.parents(node_id)) for node_id in self.nodes}
+        queue = deque(node_id for node_id, degree in indegree.items() if degree == 0)
+        order = []
+        while queue:
+            node_id = queue.popleft()
+            order.append(node_id)
+            for dest, _, _ in self.forward.get(node_id, []):
+                indegree[dest] -= 1
+                if indegree[dest] == 0:
+                    queue.append(dest)
+        if len(order) < len(self.nodes):
+            placed = set(order)
+            order.extend(node_id for node_id in self.nodes if node_id not in placed)
+        return order
@@ -1,20 +1,52 @@
-import json
 import os
 from fpdf import FPDF
 import folder_paths
+import time
 import datetime
 import traceback
-from .scanner import NodeLicenseScanner
+from concurrent.futures import ThreadPoolExecutor, wait
+from .scanner import get_node_registry, get_core_node_index
+from .model_license_cache import get_model_license_cache, UNKNOWN_LICENSE
+from .model_license_index import get_model_license_index
+from .model_hasher import get_model_hasher
+from .safetensors_metadata import get_safetensors_metadata_cache
+from .model_path_index import get_model_path_index, model_type_for_folder
+from .model_input_rules import get_model_input_classifier
+from .workflow_graph import WorkflowGraph
+from .prompt_tracer import PromptTracer
+from .output_image_index import get_output_image_index
+from .png_metadata import get_png_prompt_cache, prompt_digest
+from .pdf_images import get_pdf_image_preparer
+from .pdf_fonts import get_font_provider
+from .pdf_tables import render_table, TableColumn
+from .license_resolver import get_license_resolver, LICENSE_PENDING, HASH_SOURCE_SUFFIX
+
+# Model license resolution runs in its own stage: unique models are resolved
+# concurrently under one latency budget, and whatever is unresolved when the
+# budget runs out is reported as pending.
+LICENSE_LOOKUP_WORKERS = 8
+LICENSE_LOOKUP_BUDGET = float(os.environ.get("WORKFLOW_SUMMARY_LICENSE_BUDGET", 20))  # seconds per export
+# Longest wait for a model's first full SHA256 before an online lookup, capped at a share
+# of the remaining budget; a hash that takes longer keeps running in the background and
+# is cached for the next export. Models resolved locally never wait.
+MODEL_HASH_WAIT = 5  # seconds
+MODEL_HASH_BUDGET_SHARE = 0.25
+
+# Report tables; long sections are drawn as tables rather than line by line
+NODE_TABLE_COLUMNS = [TableColumn('Node', 4), TableColumn('Category', 3)]
+WORKFLOW_TABLE_COLUMNS = [TableColumn('ID', 1), TableColumn('Type', 4), TableColumn('Category', 3), TableColumn('License', 4)]
+MODEL_TABLE_COLUMNS = [TableColumn('Model', 4), TableColumn('License', 3), TableColumn('File', 3),
+                       TableColumn('Details', 3), TableColumn('Used in', 4)]
 
 # --- 1. Custom PDF Class for Styling ---
 class PDF(FPDF):
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        # Register system Unicode font for full Unicode support (fixes bullet "•" error)
-        self.add_font('HelveticaUnicode', '', '/System/Library/Fonts/Helvetica.ttc', uni=True)
-        self.add_font('HelveticaUnicode', 'B', '/System/Library/Fonts/Helvetica.ttc', uni=True)
-        self.add_font('HelveticaUnicode', 'I', '/System/Library/Fonts/Helvetica.ttc', uni=True)
-        self.add_font('HelveticaUnicode', 'BI', '/System/Library/Fonts/Helvetica.ttc', uni=True)
+    def set_font(self, family=None, style='', size=0):
+        # Unicode font for full Unicode support (fixes bullet "•" error): a system font
+        # where one is installed, else the bundled DejaVu Sans. Styles are registered on
+        # first use, so unused ones are not embedded.
+        if family == 'HelveticaUnicode':
+            get_font_provider().register(self, family, (style,))
+        super().set_font(family, style, size)
 
     def header(self):
         self.set_font('HelveticaUnicode', 'B', 16)
@@ -64,15 +96,16 @@ class WorkflowSummary:
             if not prompt:
                 return ("This node requires an active workflow to summarize. Please run a workflow to see the summary.",)
 
-            # Enhanced node detection - get ALL installed nodes
-            scanner = NodeLicenseScanner()
+            # Enhanced node detection - get ALL installed nodes.
+            # The registry is loaded once per process and shared by all executions.
+            registry = get_node_registry()
+            node_paths = registry.node_paths()
 
             if include_all_installed_nodes:
-                all_installed_nodes = scanner.get_all_installed_nodes()
+                all_installed_nodes = registry.all_nodes()
                 print(f"WorkflowSummary: Found {len(all_installed_nodes)} total installed nodes")
             else:
                 # Legacy mode - only custom nodes
-                node_paths = scanner.get_node_paths()
                 all_installed_nodes = {}
 
             summary = {
@@ -87,8 +120,15 @@ class WorkflowSummary:
                 }
             }
 
+            # One indexed graph serves model attribution, image discovery and prompt tracing
+            graph = WorkflowGraph(prompt)
+            model_usage = {}
+            models_by_node = {}
+            # Native ComfyUI node class names, parsed from nodes.py once per mtime
+            _, native_node_types = get_core_node_index()
+
             # Process the current workflow nodes
-            for node_id, node_info in prompt.items():
+            for node_id, node_info in graph.nodes.items():
                 node_type = node_info['class_type']
 
                 # Get license info from comprehensive node database or fallback
@@ -97,7 +137,7 @@ class WorkflowSummary:
                     node_category = all_installed_nodes[node_type].get('category', 'unknown')
                 else:
                     # Fallback for nodes not in our database
-                    license_info = self._find_node_license_legacy(node_type, scanner.get_node_paths())
+                    license_info = self._find_node_license_legacy(node_type, node_paths, native_node_types, registry)
                     node_category = 'unknown'
 
                 summary["workflow_nodes"].append({
@@ -108,22 +148,41 @@ class WorkflowSummary:
                 })
 
                 # Enhanced model detection - detect ALL model types
-                if "inputs" in node_info:
-                    inputs = node_info["inputs"]
-                    detected_models = self._detect_all_model_types(inputs, node_type)
+                if graph.literals[node_id]:
+                    detected_models = self._detect_all_model_types(graph.literals[node_id], node_type)
 
                     for model_info in detected_models:
-                        model_name = model_info['name']
-                        if not any(m['name'] == model_name for m in summary['models']):
-                            lic = self._load_license(model_name)
-                            summary["models"].append({
-                                "name": model_name,
-                                "license": lic,
+                        # Usage index keyed by (name, type): every consuming node is recorded
+                        key = (model_info['name'], model_info['type'])
+                        model = model_usage.get(key)
+                        if model is None:
+                            model = model_usage[key] = {
+                                "name": model_info['name'],
+                                "license": None,
                                 "type": model_info['type'],
-                                "node_type": node_type
-                            })
-            
-            image_data = self._get_output_image_data(prompt, extra_pnginfo)
+                                "consumers": {},
+                                "uses": 0
+                            }
+                        model['consumers'].setdefault(node_type, []).append(node_id)
+                        model['uses'] += 1
+                        models_by_node.setdefault(node_id, []).append(model_info['name'])
+            summary['models'] = list(model_usage.values())
+
+            # --- License resolution stage for all unique models ---
+            model_index = get_model_path_index()
+            model_index.refresh()
+            model_paths = {}
+            for model in summary['models']:
+                model['file'] = model_index.find(model['name'], model['type'])
+                if model['file'] or model['name'] not in model_paths:
+                    model_paths[model['name']] = model['file']['path'] if model['file'] else None
+            model_licenses = self._resolve_model_licenses(model_paths)
+            metadata_cache = get_safetensors_metadata_cache()
+            for model in summary['models']:
+                model['license'] = model_licenses[model['name']]
+                model['provenance'] = metadata_cache.get(model['file'] and model['file']['path']) or {}
+
+            image_data = self._get_output_image_data(graph, models_by_node, prompt)
 
             # --- Enhanced PDF Generation ---
             pdf = self._generate_enhanced_pdf(summary, image_data, report_type)
@@ -151,71 +210,29 @@ class WorkflowSummary:
 
     def _detect_all_model_types(self, inputs, node_type):
         """
-        Enhanced model detection - detects ALL model types, not just 3.
-        Addresses maintainer requirement: "detect all types of models"
+        Detects the model file names among a node's inputs. Nodes whose INPUT_TYPES list
+        folder_paths.get_filename_list(...) choices were mapped to folders during the
+        scan, of which only model folders count; other nodes go through the shared rule
+        table (see model_input_rules.py).
         """
-        detected_models = []
-
-        # Comprehensive model type mapping
-        model_patterns = {
-            # Checkpoints
-            "ckpt_name": "checkpoint",
-            "model_name": "checkpoint",
-            "checkpoint": "checkpoint",
-
-            # LoRA models
-            "lora_name": "lora",
-            "lora": "lora",
-            "lycoris_name": "lycoris",
-
-            # ControlNet models
-            "control_net_name": "controlnet",
-            "controlnet": "controlnet",
-            "control_net": "controlnet",
-
-            # VAE models
-            "vae_name": "vae",
-            "vae": "vae",
-
-            # Upscaler models
-            "upscale_model": "upscaler",
-            "model": "upscaler",  # Context-dependent
-
-            # Embedding/Textual Inversion
-            "embedding": "embedding",
-            "textual_inversion": "embedding",
-
-            # Face restoration
-            "face_restore_model": "face_restoration",
-            "gfpgan_model": "face_restoration",
-
-            # Other model types
-            "clip_name": "clip",
-            "unet_name": "unet",
-            "sampler_name": "sampler",
-        }
-
-        for input_key, input_value in inputs.items():
-            if isinstance(input_value, str) and input_value.strip():
-                # Check if this input matches any model pattern
-                for pattern, model_type in model_patterns.items():
-                    if pattern in input_key.lower():
-                        # Special handling for context-dependent types
-                        if pattern == "model" and node_type:
-                            if "upscale" in node_type.lower():
-                                model_type = "upscaler"
-                            elif "controlnet" in node_type.lower():
-                                model_type = "controlnet"
-                            elif "face" in node_type.lower():
-                                model_type = "face_restoration"
-
-                        detected_models.append({
-                            "name": input_value,
-                            "type": model_type,
-                            "input_key": input_key
-                        })
-                        break
+        classifier = get_model_input_classifier()
+        node = get_node_registry().get(node_type)
+        schema = node.get('model_inputs') if node else None
+        if not schema:
+            return classifier.detect(node_type, inputs)
 
+        detected_models = []
+        for input_key, folder in schema.items():
+            if not classifier.is_model_folder(folder):
+                continue
+            input_value = inputs.get(input_key)
+            # Optional model inputs offer "None" next to the folder's files
+            if isinstance(input_value, str) and input_value.strip() and input_value != "None":
+                detected_models.append({
+                    "name": input_value,
+                    "type": model_type_for_folder(folder),
+                    "input_key": input_key
+                })
         return detected_models
 
     def _generate_enhanced_pdf(self, summary, image_data, report_type):
@@ -254,32 +271,25 @@ class WorkflowSummary:
                 if core_nodes:
                     pdf.set_font('HelveticaUnicode', 'B', 11)
                     pdf.cell(0, 8, f'ComfyUI Core Nodes ({len(core_nodes)})', 0, 1)
-                    pdf.set_font('HelveticaUnicode', '', 9)
-
-                    core_lines = []
-                    for node in sorted(core_nodes, key=lambda x: x['name']):
-                        core_lines.append(f"• {node['name']} ({node.get('category', 'unknown')}) - {node['license']}")
-                    pdf.chapter_body(core_lines)
+                    render_table(pdf, 'HelveticaUnicode', NODE_TABLE_COLUMNS + [TableColumn('License', 3)], (
+                        (node['name'], node.get('category', 'unknown'), node['license'])
+                        for node in sorted(core_nodes, key=lambda x: x['name'])
+                    ), bands=2)
 
                 if custom_nodes:
                     pdf.set_font('HelveticaUnicode', 'B', 11)
                     pdf.cell(0, 8, f'Custom Nodes ({len(custom_nodes)})', 0, 1)
-                    pdf.set_font('HelveticaUnicode', '', 9)
-
-                    custom_lines = []
-                    for node in sorted(custom_nodes, key=lambda x: x['name']):
-                        package = node.get('package', 'unknown')
-                        custom_lines.append(f"• {node['name']} ({node.get('category', 'unknown')}) - Package: {package}")
-                    pdf.chapter_body(custom_lines)
+                    render_table(pdf, 'HelveticaUnicode', NODE_TABLE_COLUMNS + [TableColumn('Package', 3)], (
+                        (node['name'], node.get('category', 'unknown'), node.get('package', 'unknown'))
+                        for node in sorted(custom_nodes, key=lambda x: x['name'])
+                    ), bands=2)
 
             # --- Workflow Nodes Section ---
             pdf.chapter_title(f'Nodes Used in This Workflow ({len(summary["workflow_nodes"])})')
-            workflow_lines = []
-            for node in summary["workflow_nodes"]:
-                workflow_lines.append(f"ID: {node['id']}, Type: {node['type']} ({node.get('category', 'unknown')})")
-                workflow_lines.append(f"License: {node['license']}")
-                workflow_lines.append("")  # Empty line for spacing
-            pdf.chapter_body(workflow_lines)
+            render_table(pdf, 'HelveticaUnicode', WORKFLOW_TABLE_COLUMNS, (
+                (node['id'], node['type'], node.get('category', 'unknown'), node['license'])
+                for node in summary["workflow_nodes"]
+            ))
 
         # --- Models & Licenses Section (always included) ---
         if summary["models"]:
@@ -296,19 +306,17 @@ class WorkflowSummary:
             for model_type, models in sorted(models_by_type.items()):
                 pdf.set_font('HelveticaUnicode', 'B', 10)
                 pdf.cell(0, 6, f'{model_type.title()} Models ({len(models)})', 0, 1)
-                pdf.set_font('HelveticaUnicode', '', 9)
-
-                model_lines = []
-                for model in sorted(models, key=lambda x: x['name']):
-                    model_lines.append(f"• {model['name']}")
-                    model_lines.append(f"  License: {model['license']}")
-                    model_lines.append(f"  Used in: {model.get('node_type', 'unknown')} node")
-                    model_lines.append("")  # Spacing
-                pdf.chapter_body(model_lines)
+                render_table(pdf, 'HelveticaUnicode', MODEL_TABLE_COLUMNS, (
+                    self._model_row(model) for model in sorted(models, key=lambda x: x['name'])
+                ))
 
         # --- Generated Images & Prompts (only in full report) ---
         if report_type == "Full Report (Nodes + Licenses)" and image_data:
             pdf.chapter_title('Generated Images & Prompts')
+            # Ensure image width also respects margins
+            image_width = pdf.w - 2 * pdf.l_margin
+            # Downsampled and re-encoded for the page width, all images at once
+            prepared_images = get_pdf_image_preparer().prepare_all([img['path'] for img in image_data], image_width)
             for img_info in image_data:
                 img_path = img_info['path']
                 prompt_text = img_info.get('prompt', 'N/A')
@@ -323,18 +331,51 @@ class WorkflowSummary:
 
                 pdf.multi_cell(available_width, 4, f"Prompt: {prompt_text}")
                 pdf.multi_cell(available_width, 4, f"Negative Prompt: {negative_prompt_text}")
+                if img_info.get('models'):
+                    pdf.multi_cell(available_width, 4, f"Models: {', '.join(img_info['models'])}")
                 pdf.ln(2)
 
                 try:
-                    # Ensure image width also respects margins
-                    image_width = pdf.w - 2 * pdf.l_margin
-                    pdf.image(img_path, w=image_width)
+                    prepared = prepared_images[img_path]
+                    if prepared.error:
+                        raise prepared.error
+                    pdf.image(prepared.stream(), w=image_width)
                     pdf.ln(5)
                 except Exception as e:
                     pdf.chapter_body([f"Could not embed image {os.path.basename(img_path)}: {e}"])
 
         return pdf
 
+    def _model_row(self, model):
+        """Cells of a model's row in the models table."""
+        if model.get('file'):
+            modified = datetime.datetime.fromtimestamp(model['file']['mtime']).strftime('%Y-%m-%d %H:%M')
+            file_info = f"{self._format_size(model['file']['size'])}, modified {modified}"
+        else:
+            file_info = "not found in the model folders"
+        provenance = model.get('provenance', {})
+        details = "; ".join(f"{field.title()}: {provenance[field]}"
+                            for field in ('title', 'author', 'architecture') if provenance.get(field))
+        return (model['name'], model['license'], file_info, details, self._format_consumers(model['consumers']))
+
+    @staticmethod
+    def _format_consumers(consumers):
+        """'LoraLoader ×2 (nodes 4, 7); KSampler (node 3)' from {node class: [node ids]}."""
+        parts = []
+        for node_type, node_ids in consumers.items():
+            unique_ids = list(dict.fromkeys(node_ids))
+            count = f" ×{len(node_ids)}" if len(node_ids) > 1 else ""
+            label = "nodes" if len(unique_ids) > 1 else "node"
+            parts.append(f"{node_type}{count} ({label} {', '.join(map(str, unique_ids))})")
+        return "; ".join(parts)
+
+    @staticmethod
+    def _format_size(size):
+        for unit in ('B', 'KB', 'MB', 'GB'):
+            if size < 1024 or unit == 'GB':
+                return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+            size /= 1024
+
     def _get_license_legend(self):
         """Generate license legend explaining common licenses"""
         return [
@@ -349,344 +390,170 @@ class WorkflowSummary:
             "Note: Always verify license terms before commercial use."
         ]
 
-    def _find_node_license_legacy(self, node_type, node_paths):
+    def _find_node_license_legacy(self, node_type, node_paths, native_node_types, registry):
         """Legacy method for finding node licenses when not in comprehensive database"""
-        return self._find_node_license(node_type, node_paths)
-
-    def _find_node_license(self, node_type, node_paths):
-        # Dynamically extract native ComfyUI node class names from nodes.py
-        native_nodes_path = os.path.expanduser("~/ComfyUI/nodes.py")
-        native_node_types = set()
-        try:
-            with open(native_nodes_path, "r", encoding="utf-8") as f:
-                lines = f.readlines()
-            in_dict = False
-            for line in lines:
-                if "NODE_CLASS_MAPPINGS" in line and "=" in line and "{" in line:
-                    in_dict = True
-                    continue
-                if in_dict:
-                    if "}" in line:
-                        break
-                    # Extract key before colon, strip quotes and whitespace
-                    if ":" in line:
-                        key = line.split(":")[0].strip().strip('"').strip("'")
-                        if key:
-                            native_node_types.add(key)
-        except Exception as e:
-            # Fallback: treat as no native nodes found
-            native_node_types = set()
+        return self._find_node_license(node_type, node_paths, native_node_types, registry)
 
+    def _find_node_license(self, node_type, node_paths, native_node_types, registry):
+        # native_node_types and registry are resolved once per export by the caller
         if node_type in native_node_types:
             return "ComfyUI Native (MIT License)"
 
-        node_path = node_paths.get(node_type)
-        if not node_path:
+        if not node_paths.get(node_type):
             return "Unknown"
 
-        try:
-            search_dir = os.path.dirname(node_path)
-            # Limit search to the custom_nodes directory
-            custom_nodes_root = folder_paths.get_folder_paths("custom_nodes")[0]
-    
-            for i in range(5): # Search up to 5 parent directories
-                print(f"[LicenseTraversal] Checking directory: {search_dir} (level {i+1})")
-                try:
-                    files_in_dir = os.listdir(search_dir)
-                    print(f"[LicenseTraversal] Files in {search_dir}: {files_in_dir}")
-                except Exception as e:
-                    print(f"[LicenseTraversal] Could not list files in {search_dir}: {e}")
-                    break
-    
-                for filename in files_in_dir:
-                    if filename.lower() in ('license', 'license.md', 'license.txt'):
-                        print(f"[LicenseTraversal] Found license file: {filename} in {search_dir}")
-                        with open(os.path.join(search_dir, filename), 'r', encoding='utf-8') as f:
-                            # Return the first line of the license
-                            return f.readline().strip()
-                
-                if search_dir == custom_nodes_root:
-                    print(f"[LicenseTraversal] Reached custom_nodes_root: {custom_nodes_root}, stopping traversal.")
-                    break
-                parent_dir = os.path.dirname(search_dir)
-                if parent_dir == search_dir:
-                    print(f"[LicenseTraversal] Reached filesystem root at {search_dir}, stopping traversal.")
-                    break
-                search_dir = parent_dir
-    
-        except Exception as e:
-            print(f"[LicenseTraversal] Exception during traversal: {e}")
-            return f"Error finding license: {e}"
-                
-        print(f"[LicenseTraversal] License not found for node_type: {node_type}")
+        # Pack licenses are indexed once during the scan (LICENSE/COPYING,
+        # pyproject.toml, setup.cfg), so this is a dictionary lookup.
+        node_info = registry.get(node_type)
+        if node_info and node_info.get('license_source'):
+            return node_info['license']
         return "Not Found"
 
-    def _get_output_image_data(self, prompt, extra_pnginfo):
+    def _get_output_image_data(self, graph, models_by_node=None, prompt=None):
         image_data = []
         output_dir = folder_paths.get_output_directory()
-        
-        nodes_by_id = {node_id: info for node_id, info in prompt.items()}
-        
-        save_image_nodes = {node_id: info for node_id, info in prompt.items() if info['class_type'] == 'SaveImage'}
+
+        save_image_nodes = graph.nodes_of_class('SaveImage')
         if not save_image_nodes:
             return []
 
-        try:
-            all_files = sorted([os.path.join(output_dir, f) for f in os.listdir(output_dir)], key=os.path.getctime, reverse=True)
-        except FileNotFoundError:
-            return []
+        # Newest images per prefix; subfolders in the prefix ("proj/run") are followed
+        image_index = get_output_image_index(output_dir)
+        digest = prompt_digest(prompt) if prompt else None
 
-        # Extract links from extra_pnginfo if available, as it contains the full workflow
-        links = []
-        if extra_pnginfo and 'workflow' in extra_pnginfo and 'links' in extra_pnginfo['workflow']:
-            links = extra_pnginfo['workflow']['links']
-        elif 'links' in prompt: # Fallback if links are directly in prompt (less common for full workflow)
-            links = prompt['links']
+        # Prompts of every sampler are traced in one pass over the graph
+        tracer = PromptTracer(graph)
+        for save_node_id in save_image_nodes:
+            prefix = graph.literal(save_node_id, 'filename_prefix', '')
+            found_image_path = self._find_output_image(image_index.newest(str(prefix)), digest)
 
-        for save_node_id, save_node_info in save_image_nodes.items():
-            prefix = save_node_info['inputs']['filename_prefix']
-            
-            found_image_path = None
-            for f_path in all_files:
-                filename = os.path.basename(f_path)
-                if filename.startswith(prefix) and filename.lower().endswith(('.png', '.jpg', '.jpeg')):
-                    found_image_path = f_path
-                    break
-            
             if found_image_path:
-                prompts = self._trace_prompts_for_node(save_node_id, nodes_by_id, links)
+                prompts = self._trace_prompts_for_node(save_node_id, tracer)
+                # Models used by any node upstream of this output
+                models = []
+                for node_id in graph.ancestors(save_node_id):
+                    models.extend((models_by_node or {}).get(node_id, []))
                 image_data.append({
                     'path': found_image_path,
-                    'prompt': prompts.get('positive', 'Prompt Not Found'),
-                    'negative_prompt': prompts.get('negative', 'Negative Prompt Not Found')
+                    'prompt': prompts.get('positive') or 'Prompt Not Found',
+                    'negative_prompt': prompts.get('negative') or 'Negative Prompt Not Found',
+                    'models': list(dict.fromkeys(models))
                 })
         return image_data
 
-    def _trace_prompts_for_node(self, start_node_id, nodes, links):
+    def _find_output_image(self, candidates, digest):
+        """
+        Picks the image this prompt wrote among candidates (newest first). SaveImage
+        embeds the executed prompt in PNGs, so an image whose embedded prompt matches is
+        taken; images without one (JPEGs, metadata disabled) are a fallback. Images
+        written by other prompts, e.g. concurrent queue jobs, are never taken.
+        """
+        prompt_cache = get_png_prompt_cache()
+        fallback = None
+        for path in candidates:
+            image_digest = prompt_cache.digest(path) if digest else None
+            if image_digest is None:
+                fallback = fallback or path
+            elif image_digest == digest:
+                return path
+        return fallback
+
+    def _trace_prompts_for_node(self, start_node_id, tracer):
         """Traces back from a starting node to find positive and negative prompts."""
-        prompts = {}
-        
-        # Create a reverse mapping of links for easier traversal
-        reverse_links = {}
-        for link_info in links: # links is a list of lists, not a dict
-            link_id, source_node_id, source_output_idx, dest_node_id, dest_input_idx, link_type = link_info
-            
-            dest_node_id_str = str(dest_node_id)
-            source_node_id_str = str(source_node_id)
-
-            dest_node_info = nodes.get(dest_node_id_str)
-            if dest_node_info and 'inputs' in dest_node_info:
-                # Find the input name corresponding to the index
-                input_name = None
-                # ComfyUI inputs can be a list of dicts or a dict of dicts
-                if isinstance(dest_node_info['inputs'], list):
-                    for input_def in dest_node_info['inputs']:
-                        if input_def.get('link') == link_id:
-                            input_name = input_def.get('name')
-                            break
-                elif isinstance(dest_node_info['inputs'], dict):
-                    # This is a more complex case, often inputs are by index in links
-                    # We need to map dest_input_idx to input name
-                    # This is a heuristic, as ComfyUI's internal structure can vary
-                    # For now, we'll rely on the link_info[4] (dest_input_idx)
-                    pass # We'll try to infer input name later if needed
-
-                if input_name is None: # Fallback for cases where input name isn't directly found
-                    # Try to infer input name from common patterns or link type
-                    if dest_node_info['class_type'] == 'KSampler':
-                        if dest_input_idx == 1: input_name = 'positive' # Heuristic for KSampler
-                        elif dest_input_idx == 2: input_name = 'negative' # Heuristic for KSampler
-                    elif link_type == 'CONDITIONING':
-                        # This is a very loose heuristic
-                        input_name = 'conditioning'
-                    elif link_type == 'STRING':
-                        input_name = 'text' # Common for text inputs
-
-                if input_name:
-                    if dest_node_id_str not in reverse_links:
-                        reverse_links[dest_node_id_str] = []
-                    
-                    reverse_links[dest_node_id_str].append({
-                        "source_node_id": source_node_id_str,
-                        "source_output_idx": source_output_idx,
-                        "dest_input_name": input_name
-                    })
-
-        # Recursive function to trace back
-        def find_text_in_ancestors(node_id, visited):
-            if node_id in visited:
-                return None
-            visited.add(node_id)
-
-            node_info = nodes.get(node_id)
-            if not node_info:
-                return None
-
-            # Base case: Found a node that contains a text widget or input
-            if node_info['class_type'] == 'CLIPTextEncode' and 'inputs' in node_info and 'text' in node_info['inputs']:
-                return node_info['inputs']['text']
-            
-            # Check for text in widgets_values (for simple text input nodes)
-            if 'widgets_values' in node_info and node_info['widgets_values']:
-                # Heuristic: assume the first widget value is the text
-                return str(node_info['widgets_values'][0])
-
-            # Recursive step: traverse to parent nodes
-            if node_id in reverse_links:
-                for link in reverse_links[node_id]:
-                    found_text = find_text_in_ancestors(link['source_node_id'], visited)
-                    if found_text:
-                        return found_text
-            return None
-
-        # Start tracing from the KSampler or equivalent node that feeds into SaveImage
-        image_source_node_id = None
-        if str(start_node_id) in reverse_links:
-            for link in reverse_links[str(start_node_id)]:
-                # Assuming the image is the first input or named 'images'
-                if link['dest_input_name'] == 'images' or link['dest_input_name'] == 'pixels': # Common image input names
-                    image_source_node_id = link['source_node_id']
-                    break
-        
-        if image_source_node_id:
-            # Now, from the image source node, find its positive and negative inputs
-            if image_source_node_id in reverse_links:
-                for link in reverse_links[image_source_node_id]:
-                    if link['dest_input_name'] == 'positive':
-                        prompts['positive'] = find_text_in_ancestors(link['source_node_id'], set())
-                    elif link['dest_input_name'] == 'negative':
-                        prompts['negative'] = find_text_in_ancestors(link['source_node_id'], set())
-
-        return prompts
-
-    def _load_license(self, model_name):
-        import requests
+        return tracer.prompts_for(start_node_id)
 
-        def debug(msg):
-            print(f"[WorkflowSummary][LicenseLookup] {msg}")
-
-        # 1. Try local mapping
-        path = os.path.join(os.path.dirname(__file__), "model_licenses.json")
-        try:
-            with open(path, 'r') as f:
-                data = json.load(f)
-            base_model_name = os.path.basename(model_name)
-            license_val = data.get(base_model_name, data.get(model_name))
-            debug(f"Local mapping: {base_model_name} -> {license_val}")
-            if license_val:
-                return license_val
-        except Exception as e:
-            debug(f"Local mapping exception: {e}")
-
-        # 2. Try HuggingFace direct repo_id lookup
-        def try_hf_lookup(repo_id):
-            url = f"https://huggingface.co/api/models/{repo_id}"
-            debug(f"Trying HuggingFace direct lookup: {url}")
-            try:
-                resp = requests.get(url, timeout=5)
-                debug(f"Direct lookup status: {resp.status_code}")
-                if resp.status_code == 200:
-                    data = resp.json()
-                    debug(f"Direct lookup result: {data.get('license', None)}")
-                    return data.get("license", None)
-            except Exception as e:
-                debug(f"Direct lookup exception: {e}")
-            return None
-
-        # 2a. Try direct lookup by filename (legacy, may fail)
-        repo_id = os.path.splitext(os.path.basename(model_name))[0]
-        license_val = try_hf_lookup(repo_id)
-        if license_val:
-            debug(f"Direct HuggingFace license found: {license_val}")
-            return f"HuggingFace: {license_val}"
-
-        # 2b. Try HuggingFace search API if direct lookup fails
-        def try_hf_search(model_name):
-            import re
-            base_name = os.path.splitext(os.path.basename(model_name))[0]
-            alphanum = re.sub(r'[^a-zA-Z0-9]', '', base_name)
-            search_key = alphanum[:6] if len(alphanum) >= 6 else alphanum
-            url = f"https://huggingface.co/api/models?search={search_key}"
-            debug(f"Trying HuggingFace search: {url}")
+    def _resolve_model_licenses(self, model_paths):
+        """
+        Resolves the licenses of all models concurrently in a bounded thread pool.
+        model_paths maps each model name to its file (or None when it was not found).
+        All lookups share one deadline of LICENSE_LOOKUP_BUDGET seconds; providers stop
+        at the deadline and the affected models are reported as pending.
+        """
+        licenses = {}
+        if not model_paths:
+            return licenses
+
+        deadline = time.monotonic() + LICENSE_LOOKUP_BUDGET
+        executor = ThreadPoolExecutor(max_workers=min(LICENSE_LOOKUP_WORKERS, len(model_paths)))
+        futures = {executor.submit(self._load_license, name, deadline, path): name
+                   for name, path in model_paths.items()}
+        # Small grace period for lookups that are returning right at the deadline
+        done, not_done = wait(futures, timeout=LICENSE_LOOKUP_BUDGET + 0.5)
+        executor.shutdown(wait=False, cancel_futures=True)
+
+        for future in done:
             try:
-                resp = requests.get(url, timeout=5)
-                debug(f"Search status: {resp.status_code}")
-                if resp.status_code == 200:
-                    data = resp.json()
-                    debug(f"Search results: {[repo.get('modelId') for repo in data]}")
-                    if isinstance(data, list) and data:
-                        def score(repo):
-                            rid = repo.get("modelId", "").lower()
-                            if base_name.lower() in rid:
-                                return 2
-                            if rid.startswith(search_key.lower()):
-                                return 1
-                            return 0
-                        best = max(data, key=score)
-                        repo_id = best.get("modelId")
-                        debug(f"Best match repo_id: {repo_id}")
-                        if repo_id:
-                            license_val = try_hf_lookup(repo_id)
-                            if license_val:
-                                debug(f"Search HuggingFace license found: {license_val}")
-                                return f"HuggingFace: {license_val} (from search: {repo_id})"
-                            # If not found, try to get license from model card metadata (more robust)
-                            url_meta = f"https://huggingface.co/api/models/{repo_id}"
-                            try:
-                                resp_meta = requests.get(url_meta, timeout=5)
-                                debug(f"Meta lookup status: {resp_meta.status_code}")
-                                if resp_meta.status_code == 200:
-                                    meta = resp_meta.json()
-                                    # Try to find license in meta fields
-                                    for k in ["license", "cardData", "modelCardData"]:
-                                        if k in meta and meta[k]:
-                                            if isinstance(meta[k], dict):
-                                                # Look for license in nested dict
-                                                for subk in ["license", "license_name"]:
-                                                    if subk in meta[k] and meta[k][subk]:
-                                                        debug(f"Meta nested license found: {meta[k][subk]}")
-                                                        return f"HuggingFace: {meta[k][subk]} (from meta: {repo_id})"
-                                            elif isinstance(meta[k], str):
-                                                debug(f"Meta license found: {meta[k]}")
-                                                return f"HuggingFace: {meta[k]} (from meta: {repo_id})"
-                            except Exception as e:
-                                debug(f"Meta lookup exception: {e}")
+                licenses[futures[future]] = future.result()
             except Exception as e:
-                debug(f"Search exception: {e}")
-            return None
+                print(f"[WorkflowSummary][LicenseLookup] Lookup failed for {futures[future]}: {e}")
+                licenses[futures[future]] = UNKNOWN_LICENSE
+        for future in not_done:
+            licenses[futures[future]] = LICENSE_PENDING
+        if not_done:
+            print(f"[WorkflowSummary][LicenseLookup] {len(not_done)} model(s) still pending after {LICENSE_LOOKUP_BUDGET}s")
+        return licenses
+
+    def _load_license(self, model_name, deadline=None, model_path=None):
+        def debug(msg):
+            print(f"[WorkflowSummary][LicenseLookup] {msg}")
 
-        license_val = try_hf_search(model_name)
+        # 1. Try local mapping (indexed once, reloaded when model_licenses.json changes)
+        index = get_model_license_index()
+        license_val = index.lookup(model_name)
         if license_val:
+            debug(f"Local mapping: {model_name} -> {license_val}")
             return license_val
 
-        # 3. Try CivitAI API
-        def try_civitai_lookup(model_name):
-            civitai_name = os.path.splitext(os.path.basename(model_name))[0]
-            url = f"https://civitai.com/api/v1/models?query={civitai_name}"
-            debug(f"Trying CivitAI lookup: {url}")
-            try:
-                resp = requests.get(url, timeout=5)
-                debug(f"CivitAI status: {resp.status_code}")
-                if resp.status_code == 200:
-                    data = resp.json()
-                    debug(f"CivitAI results: {data.get('items', [])}")
-                    if "items" in data and data["items"]:
-                        item = data["items"][0]
-                        if "modelVersions" in item and item["modelVersions"]:
-                            mv = item["modelVersions"][0]
-                            if "license" in mv and mv["license"]:
-                                debug(f"CivitAI license found: {mv['license']}")
-                                return f"CivitAI: {mv['license']}"
-                        if "license" in item and item["license"]:
-                            debug(f"CivitAI license found: {item['license']}")
-                            return f"CivitAI: {item['license']}"
-            except Exception as e:
-                debug(f"CivitAI exception: {e}")
+        # 2. License embedded in the safetensors header (modelspec metadata)
+        metadata = get_safetensors_metadata_cache().get(model_path)
+        if metadata and metadata.get("license"):
+            debug(f"Embedded metadata: {model_name} -> {metadata['license']}")
+            return f"Embedded metadata: {metadata['license']}"
+
+        cache = get_model_license_cache()
+
+        def lookup_hash(partial, sha256):
+            license_val = index.lookup_hash(sha256)
+            if license_val:
+                debug(f"Local hash mapping: {model_name} ({sha256[:10]}) -> {license_val}")
+                return license_val
+            cached = cache.get_by_hash(sha256, partial)
+            if cached:
+                debug(f"Hash cache hit: {model_name} -> {cached[0]} (source: {cached[1]})")
+                return cached[0]
             return None
 
-        license_val = try_civitai_lookup(model_name)
-        if license_val:
-            return license_val
+        # 3. Identify the file by content without waiting: the partial hash, and the
+        # full hash when it is already cached. Known hashes resolve without the network.
+        partial, sha256 = None, None
+        if model_path:
+            partial, sha256 = get_model_hasher().identify(model_path, timeout=0) or (None, None)
+            license_val = lookup_hash(partial, sha256)
+            if license_val:
+                return license_val
+
+        # 4. Remote lookups are cached on disk, including "unknown" results
+        cached = cache.get(model_name)
+        if cached:
+            debug(f"Cache hit: {model_name} -> {cached[0]} (source: {cached[1]})")
+            return cached[0]
+
+        # 5. A provider call is next: wait briefly for a new full hash, which may be
+        # known locally and lets CivitAI look the file up by content
+        if partial and not sha256:
+            wait_time = MODEL_HASH_WAIT
+            if deadline is not None:
+                wait_time = max(min(wait_time, (deadline - time.monotonic()) * MODEL_HASH_BUDGET_SHARE), 0)
+            partial, sha256 = get_model_hasher().identify(model_path, timeout=wait_time) or (partial, None)
+            license_val = lookup_hash(partial, sha256)
+            if license_val:
+                return license_val
 
-        debug("No license found, returning 'unknown'")
-        return "unknown"
+        license_val, source = get_license_resolver().resolve(model_name, deadline, sha256=sha256)
+        if source != "timeout":
+            cache.put(model_name, license_val, source)
+            # Only answers that identified the file by content are recorded by hash;
+            # name-based matches are guesses and stay in the expiring name cache
+            if license_val != UNKNOWN_LICENSE and source.endswith(HASH_SOURCE_SUFFIX):
+                cache.put_hash([sha256, partial], model_name, license_val, source)
+        return license_val